@@ -1,38 +1,80 @@
-import requests
 from bs4 import BeautifulSoup
 import csv
+import os
 import re
+import sys
 import numpy as np
 from transformers import pipeline
 from sentence_transformers import SentenceTransformer
+import instrument
+from wikiapi import get_json, cut_at_first_heading, strip_boilerplate, approx_tokens, BOILERPLATE_SELECTORS
+from runstore import open_run, is_complete, output_path, record_revision, record_cleaning, finish, file_hash
+from gazetteer import GAZETTEER_FILE, optional_automaton, find_people
+from checkpoint import CHECKPOINT_FILE, reset_checkpoint, process_titles
 
 # === CONFIGURACIÓN ===
 API_URL = "https://en.wikipedia.org/w/api.php"
 TITLE = "Theoretical physics"
 TARGET_SECTIONS = ["Mainstream theories", "Proposed theories", "Fringe theories"]
 EXCLUDED_SECTIONS = {"See also", "References", "Further reading", "External links", "Bibliography", "Notes"}
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+NER_MODEL = "dslim/bert-base-NER"
+# Gazetteer de físicos (Wikidata): el NER corre solo sobre las oraciones que no
+# resuelve; GAZETTEER_MODE=off (o una descarga fallida) deja solo el NER
+GAZETTEER_MODE = os.environ.get("GAZETTEER_MODE", "remainder")
+automaton = optional_automaton(GAZETTEER_MODE)
+
+# === CORRIDA (runs/<hash>/) ===
+RUN_CONFIG = {
+    "script": "auth2",
+    "title": TITLE,
+    "target_sections": TARGET_SECTIONS,
+    "excluded_sections": sorted(EXCLUDED_SECTIONS),
+    "models": {"embedding": EMBEDDING_MODEL, "sentiment": SENTIMENT_MODEL, "ner": NER_MODEL},
+    "truncation": {"sentiment_chars": 512, "ner_chars": 1000},
+    "gazetteer": file_hash(GAZETTEER_FILE) if automaton else None,
+    "dom_cleaning": BOILERPLATE_SELECTORS,
+}
+METRICS_FILE = "theory6_sentiment_embeddings.csv"
+EDGES_FILE = "theory6_author_bipartite.csv"
+
+run = open_run(RUN_CONFIG)
+if is_complete(run):
+    print(f"Corrida {run['id']} ya calculada con esta configuración: {run['dir']}")
+    sys.exit(0)
+
+# Por defecto se reanuda desde el checkpoint de la corrida; --fresh empieza de cero
+checkpoint_path = output_path(run, CHECKPOINT_FILE)
+if "--fresh" in sys.argv:
+    reset_checkpoint(checkpoint_path)
 
 # === MODELOS ===
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-ner_pipeline = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+embedder = SentenceTransformer(EMBEDDING_MODEL)
+sentiment_pipeline = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+ner_pipeline = pipeline("ner", model=NER_MODEL, aggregation_strategy="simple")
 
 # === FUNCIONES DE TEXTO Y MÉTRICAS ===
 
+@instrument.timed("clean")
 def preprocess_text(text):
     text = re.sub(r'\[\d+\]', '', text)
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
+@instrument.timed("sentiment")
 def get_sentiment_score(text):
     try:
+        instrument.count_tokens("sentiment", sentiment_pipeline.tokenizer, text[:512])
         result = sentiment_pipeline(text[:512])[0]
         score = result["score"]
         return score if result["label"] == "POSITIVE" else -score
     except:
         return 0.0
 
+@instrument.timed("embedding")
 def get_embedding(text):
+    instrument.count_tokens("embedding", embedder.tokenizer, text)
     return embedder.encode(text)
 
 def calculate_readability(text):
@@ -51,7 +93,9 @@ def analyze_text(text):
 
 # === NER: Extracción de personas (autores) ===
 
+@instrument.timed("ner")
 def extract_people_ner(text):
+    instrument.count_tokens("ner", ner_pipeline.tokenizer, text[:1000])
     entities = ner_pipeline(text[:1000])  # truncado por eficiencia
     return {ent['word'].strip() for ent in entities if ent['entity_group'] == "PER"}
 
@@ -59,45 +103,49 @@ def extract_people_ner(text):
 
 def get_section_index(title):
     params = {"action": "parse", "format": "json", "page": title, "prop": "sections"}
-    response = requests.get(API_URL, params=params).json()
+    response = get_json(API_URL, params)
     return response["parse"]["sections"]
 
-def get_section_text(title, index):
+def get_section_text(title, index, saved):
     params = {"action": "parse", "format": "json", "page": title, "prop": "text", "section": index}
-    response = requests.get(API_URL, params=params).json()
+    response = get_json(API_URL, params)
     html = response["parse"]["text"]["*"]
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(separator=" ", strip=True)
-
-def get_lead_paragraphs(title):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "redirects": True}
-    response = requests.get(API_URL, params=params).json()
+    with instrument.stage("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+        saved.append(strip_boilerplate(soup))
+        return soup.get_text(separator=" ", strip=True)
+
+def get_lead_paragraphs(title, saved):
+    params = {"action": "parse", "format": "json", "page": title, "prop": "text|revid", "redirects": True}
+    response = get_json(API_URL, params)
+    record_revision(run, title, response["parse"].get("revid"))
     html = response["parse"]["text"]["*"]
-    soup = BeautifulSoup(html, "html.parser")
-    lead_paragraphs = []
-    for tag in soup.find_all(["p", "h2"]):
-        if tag.name == "h2":
-            break
-        if tag.name == "p":
-            lead_paragraphs.append(tag.get_text(strip=True))
+    with instrument.stage("parse"):
+        soup = cut_at_first_heading(BeautifulSoup(html, "html.parser"))
+        saved.append(strip_boilerplate(soup))
+        lead_paragraphs = [tag.get_text(strip=True) for tag in soup.find_all("p")]
     return " ".join(lead_paragraphs)
 
 def get_full_article_text_excluding(title):
     try:
         sections = get_section_index(title)
-        lead = get_lead_paragraphs(title)
+        saved = []  # tokens quitados del DOM (navbox/infobox/refs/math/tablas)
+        lead = get_lead_paragraphs(title, saved)
         full_text = lead + " "
         for sec in sections:
             name = sec["line"].strip()
             index = sec["index"]
             if name not in EXCLUDED_SECTIONS:
-                section_text = get_section_text(title, index)
+                section_text = get_section_text(title, index, saved)
                 full_text += " " + section_text
-        return preprocess_text(full_text)
+        full_text = preprocess_text(full_text)
+        record_cleaning(run, title, approx_tokens(full_text), sum(saved))
+        return full_text
     except Exception as e:
         print(f"[Error extracting full article for {title}] {e}")
         return ""
 
+@instrument.timed("parse")
 def extract_links_from_html(html):
     soup = BeautifulSoup(html, "html.parser")
     links = set()
@@ -110,13 +158,13 @@ def extract_links_from_html(html):
 
 def get_section_html(title, index):
     params = {"action": "parse", "format": "json", "page": title, "prop": "text", "section": index}
-    response = requests.get(API_URL, params=params).json()
+    response = get_json(API_URL, params)
     return response["parse"]["text"]["*"]
 
 # === EXTRAER TEORÍAS DESDE SECCIONES TARGET ===
 
 params = {"action": "parse", "format": "json", "page": TITLE, "prop": "sections"}
-response = requests.get(API_URL, params=params).json()
+response = get_json(API_URL, params)
 section_indices = {sec["line"].strip(): sec["index"] for sec in response["parse"]["sections"] if sec["line"].strip() in TARGET_SECTIONS}
 
 all_labels = set()
@@ -130,47 +178,43 @@ for section_name in TARGET_SECTIONS:
 
 # === PROCESAR CADA TEORÍA ===
 
-all_results = []
-bipartite_edges = []
-seen_titles = set()
+def process_theory(label):
+    full_text = get_full_article_text_excluding(label)
+    if not full_text.strip():
+        raise Exception("No usable text.")
+    print(f"\n--- {label} ---")
+    print(full_text[:600] + " [...]" if len(full_text) > 600 else full_text)
 
-for label in sorted(all_labels):
-    if label in seen_titles:
-        continue
-    seen_titles.add(label)
-    try:
-        full_text = get_full_article_text_excluding(label)
-        if not full_text.strip():
-            raise Exception("No usable text.")
-        print(f"\n--- {label} ---")
-        print(full_text[:600] + " [...]" if len(full_text) > 600 else full_text)
-
-        polarity, subjectivity, readability = analyze_text(full_text)
-        all_results.append({
-            "Theory": label,
-            "Polarity": polarity,
-            "Subjectivity": subjectivity,
-            "Readability": readability
-        })
-
-        found_people = extract_people_ner(full_text)
-        for person in found_people:
-            bipartite_edges.append((label, person))
+    polarity, subjectivity, readability = analyze_text(full_text)
+    result = {
+        "Theory": label,
+        "Polarity": polarity,
+        "Subjectivity": subjectivity,
+        "Readability": readability
+    }
 
-    except Exception as e:
-        print(f"[Error processing {label}] {e}")
-        continue
+    found_people = (find_people(full_text, automaton, extract_people_ner) if automaton
+                    else extract_people_ner(full_text))
+    return result, [(label, person) for person in sorted(found_people)]
+
+all_results, bipartite_edges, pending = process_titles(checkpoint_path, all_labels, process_theory)
 
 # === GUARDAR CSV DE MÉTRICAS Y DE GRAFO BIPARTITO ===
 
-with open("theory6_sentiment_embeddings.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, METRICS_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.DictWriter(f, fieldnames=["Theory", "Polarity", "Subjectivity", "Readability"])
     writer.writeheader()
     for row in all_results:
         writer.writerow(row)
 
-with open("theory6_author_bipartite.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, EDGES_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.writer(f)
     writer.writerow(["Theory", "Author"])
     for theory, author in bipartite_edges:
         writer.writerow([theory, author])
+
+finish(run, [METRICS_FILE, EDGES_FILE], pending)
+instrument.finish_trace(run["dir"])
+print(f"\nCorrida {run['id']} guardada en {run['dir']}")
+if pending:
+    print(f"{len(pending)} teorías pendientes (fallidas o sin procesar); volver a ejecutar para reintentarlas")
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+import wikiapi
+from wikiapi import (get_page_html, get_section_index, get_section_html, lead_text_from_html, html_to_text,
+                     extract_links_from_html, preprocess_text, get_wikidata_id, get_authors_from_wikidata,
+                     get_theory_titles, EXCLUDED_SECTIONS)
+
+# === CONFIGURACIÓN ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BASE_DIR, "fixtures", "wikipedia.zip")
+TITLE = "Theoretical physics"
+TARGET_SECTIONS = ["Mainstream theories", "Proposed theories", "Fringe theories"]
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+# === GRABACIÓN DEL CORPUS ===
+# Recorre el mismo conjunto de teorías que try6.py (parse de la página, secciones
+# y consultas de Wikidata) guardando cada respuesta en el zip de fixtures.
+def record(archive_path=FIXTURES):
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+    recorder = wikiapi.recording_transport(archive_path)
+    wikiapi.set_transport(recorder)
+    try:
+        titles = sorted(get_theory_titles(TITLE, TARGET_SECTIONS))
+        for title in titles:
+            try:
+                fetch_page(title)
+                wikidata_id = get_wikidata_id(title)
+                if wikidata_id:
+                    get_authors_from_wikidata(wikidata_id)
+                print(f"[grabado] {title}")
+            except Exception as e:
+                print(f"[Error grabando {title}] {e}")
+    finally:
+        recorder.archive.close()
+        wikiapi.set_transport(None)
+    return titles
+
+
+# === ETAPAS ===
+def fetch_page(title):
+    page_html, _ = get_page_html(title)
+    sections = [get_section_html(title, sec['index']) for sec in get_section_index(title)
+                if sec['line'].strip() not in EXCLUDED_SECTIONS]
+    return {"title": title, "lead": page_html, "sections": sections}
+
+
+def stage_fetch(titles):
+    pages = []
+    for title in titles:
+        try:
+            pages.append(fetch_page(title))
+        except KeyError:
+            continue
+    return pages
+
+
+def stage_parse(pages):
+    return {page["title"]: lead_text_from_html(page["lead"]) + " " + " ".join(html_to_text(h) for h in page["sections"])
+            for page in pages}
+
+
+def stage_clean(texts):
+    return {title: preprocess_text(text) for title, text in texts.items()}
+
+
+def stage_graph(pages, titles):
+    # Aristas de citación entre teorías y autores de Wikidata, como en try6/relatedTherories
+    theory_set = set(titles)
+    citations = set()
+    for page in pages:
+        for link in extract_links_from_html(page["lead"]):
+            if link in theory_set and link != page["title"]:
+                citations.add((page["title"], link))
+    authors = set()
+    for title in titles:
+        try:
+            wikidata_id = get_wikidata_id(title)
+        except KeyError:
+            continue
+        if wikidata_id:
+            authors.update((title, author) for author in get_authors_from_wikidata(wikidata_id))
+    return citations, authors
+
+
+def make_model_stage():
+    from transformers import pipeline
+    from sentence_transformers import SentenceTransformer
+    sentiment_pipeline = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+    embedder = SentenceTransformer(EMBEDDING_MODEL)
+
+    def stage_model(texts):
+        values = list(texts.values())
+        sentiment_pipeline([t[:512] for t in values])
+        embedder.encode(values)
+    return stage_model
+
+
+# === MEDICIÓN ===
+def measure(func, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"min": min(times), "median": statistics.median(times), "repeat": repeat, "peak_bytes": peak}
+
+
+def run_benchmarks(archive_path=FIXTURES, repeat=5, models=False):
+    replay = wikiapi.replay_transport(archive_path)
+    wikiapi.set_transport(replay)
+    try:
+        titles = sorted(get_theory_titles(TITLE, TARGET_SECTIONS))
+        results = {}
+        pages, results["fetch"] = measure(stage_fetch, titles, repeat=repeat)
+        texts, results["parse"] = measure(stage_parse, pages, repeat=repeat)
+        cleaned, results["clean"] = measure(stage_clean, texts, repeat=repeat)
+        if models:
+            _, results["model"] = measure(make_model_stage(), cleaned, repeat=repeat)
+        _, results["graph"] = measure(stage_graph, pages, titles, repeat=repeat)
+    finally:
+        replay.archive.close()
+        wikiapi.set_transport(None)
+    return {"python": platform.python_version(), "machine": platform.machine(), "pages": len(pages),
+            "stages": results}
+
+
+def compare(current, baseline):
+    lines = [f"{'Etapa':<8}{'Mediana (s)':>14}{'Base (s)':>12}{'Razón':>8}{'Pico MB':>10}"]
+    for name, stats in current["stages"].items():
+        base = baseline["stages"].get(name) if baseline else None
+        ratio = f"{stats['median'] / base['median']:.2f}x" if base else "-"
+        base_median = f"{base['median']:.4f}" if base else "-"
+        lines.append(f"{name:<8}{stats['median']:>14.4f}{base_median:>12}{ratio:>8}{stats['peak_bytes'] / 2**20:>10.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline del pipeline de teorías")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--models", action="store_true", help="Incluir la etapa de modelos (requiere transformers)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        titles = record(args.fixtures)
+        print(f"{len(titles)} teorías grabadas en {args.fixtures}")
+    else:
+        current = run_benchmarks(args.fixtures, args.repeat, args.models)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        print(compare(current, baseline))
@@ -0,0 +1,141 @@
+import argparse
+import glob
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# === PROYECCIÓN DEL GRAFO BIPARTITO TEORÍA–AUTOR ===
+# Con la matriz de incidencia B (teorías x autores, 1 si el autor aparece en la
+# teoría) las dos proyecciones son productos dispersos:
+#   teoría–teoría = B @ B.T   (autores compartidos)
+#   autor–autor   = B.T @ B   (teorías en común)
+# El producto se hace por bloques de filas dimensionados según el tamaño
+# estimado de su resultado, y cada bloque se poda a los top-k vecinos de cada
+# nodo antes de acumular, así la memoria queda acotada aunque el grafo
+# bipartito sea muy grande o tenga intermediarios con miles de vecinos.
+PATTERN = "theory*_author_bipartite.csv"
+DEFAULT_FILES = ["theory_author_cleaned_final.csv"]
+WEIGHTINGS = ("count", "jaccard", "newman")
+BLOCK_PAIRS = 5_000_000  # pares (fila, vecino) por bloque antes de podar
+
+
+# === CARGA ===
+def load_incidence(paths, left="Theory", right="Author"):
+    df = pd.concat([pd.read_csv(p, usecols=[left, right], dtype=str) for p in paths], ignore_index=True)
+    df = df.dropna()
+    df[left] = df[left].str.strip()
+    df[right] = df[right].str.strip()
+    rows, left_nodes = pd.factorize(df[left])
+    cols, right_nodes = pd.factorize(df[right])
+    incidence = sp.csr_matrix((np.ones(len(df), dtype=np.float64), (rows, cols)),
+                              shape=(len(left_nodes), len(right_nodes)))
+    incidence.data[:] = 1.0  # pares repetidos (entre archivos) cuentan una vez
+    return np.asarray(left_nodes, dtype=object), np.asarray(right_nodes, dtype=object), incidence
+
+
+# === PODA ===
+def top_k_mask(rows, weights, k):
+    # True para las k aristas de mayor peso de cada fila (filas ya agrupadas)
+    order = np.lexsort((-weights, rows))
+    sorted_rows = rows[order]
+    start = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+    rank = np.arange(len(rows)) - np.repeat(start, np.diff(np.r_[start, len(rows)]))
+    mask = np.zeros(len(rows), dtype=bool)
+    mask[order[rank < k]] = True
+    return mask
+
+
+# === PROYECCIÓN ===
+def row_blocks(incidence, transposed, budget=BLOCK_PAIRS):
+    # Cota de pares por fila: suma de los grados de sus intermediarios
+    estimate = incidence @ np.diff(transposed.indptr).astype(np.float64)
+    cumulative = np.cumsum(estimate)
+    start, n = 0, incidence.shape[0]
+    while start < n:
+        end = max(int(np.searchsorted(cumulative, cumulative[start] - estimate[start] + budget, side="right")),
+                  start + 1)
+        yield start, min(end, n)
+        start = end
+
+
+def project(incidence, weighting="count", top_k=None, min_shared=1, budget=BLOCK_PAIRS):
+    # Devuelve (origen, destino, peso, compartidos) con origen < destino
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Ponderación desconocida '{weighting}', usar una de {WEIGHTINGS}")
+    incidence = incidence.tocsr()
+    transposed = incidence.T.tocsr()
+    degree = np.asarray(incidence.sum(axis=1)).ravel()
+    if weighting == "newman":
+        # Newman (2001): cada intermediario de grado k aporta 1/(k-1) a cada par
+        k = np.asarray(incidence.sum(axis=0)).ravel()
+        scale = sp.diags(np.divide(1.0, k - 1, out=np.zeros(len(k)), where=k > 1))
+        weighted_transposed = (scale @ transposed).tocsr()
+
+    sources, targets, weights, shared = [], [], [], []
+    for start, end in row_blocks(incidence, transposed, budget):
+        block = incidence[start:end]
+        counts = (block @ transposed).tocoo()
+        rows = counts.row + start
+        keep = (rows != counts.col) & (counts.data >= min_shared)
+        rows, cols, common = rows[keep], counts.col[keep], counts.data[keep]
+
+        if weighting == "count":
+            weight = common
+        elif weighting == "jaccard":
+            weight = common / (degree[rows] + degree[cols] - common)
+        else:
+            # Bloque sin pares fuera de la diagonal: indexar con listas vacías no da un arreglo vacío
+            newman = (block @ weighted_transposed).tocsr()
+            weight = np.asarray(newman[rows - start, cols]).ravel() if len(rows) else np.zeros(0)
+
+        if top_k:
+            mask = top_k_mask(rows, weight, top_k)
+            rows, cols, weight, common = rows[mask], cols[mask], weight[mask], common[mask]
+        sources.append(rows)
+        targets.append(cols)
+        weights.append(weight)
+        shared.append(common)
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    weights, shared = np.concatenate(weights), np.concatenate(shared)
+    # Arista no dirigida: se queda si está en el top-k de cualquiera de los dos extremos
+    lo, hi = np.minimum(sources, targets), np.maximum(sources, targets)
+    _, first = np.unique(lo.astype(np.int64) * incidence.shape[0] + hi, return_index=True)
+    return lo[first], hi[first], weights[first], shared[first].astype(np.int64)
+
+
+def projection_frame(nodes, edges):
+    source, target, weight, shared = edges
+    df = pd.DataFrame({"Source": nodes[source], "Target": nodes[target], "Weight": weight, "Shared": shared})
+    return df.sort_values(["Weight", "Source", "Target"], ascending=[False, True, True], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proyecciones teoría–teoría y autor–autor del grafo bipartito")
+    parser.add_argument("files", nargs="*", help=f"CSV Theory,Author (por defecto {DEFAULT_FILES[0]})")
+    parser.add_argument("--all-runs", action="store_true", help=f"usar también todos los {PATTERN}")
+    parser.add_argument("--weighting", choices=WEIGHTINGS, default="count")
+    parser.add_argument("--top-k", type=int, default=None, help="vecinos más fuertes a conservar por nodo")
+    parser.add_argument("--min-shared", type=int, default=1)
+    parser.add_argument("--out-prefix", default="")
+    args = parser.parse_args()
+
+    paths = args.files or DEFAULT_FILES
+    if args.all_runs:
+        paths = sorted(set(paths) | set(glob.glob(PATTERN)))
+
+    start = time.perf_counter()
+    theories, authors, incidence = load_incidence(paths)
+    theory_edges = project(incidence, args.weighting, args.top_k, args.min_shared)
+    author_edges = project(incidence.T, args.weighting, args.top_k, args.min_shared)
+    elapsed = time.perf_counter() - start
+
+    theory_df = projection_frame(theories, theory_edges)
+    author_df = projection_frame(authors, author_edges)
+    theory_df.to_csv(f"{args.out_prefix}theory_projection.csv", index=False)
+    author_df.to_csv(f"{args.out_prefix}author_projection.csv", index=False)
+
+    print(f"{len(theories)} teorías x {len(authors)} autores, {incidence.nnz} pares ({elapsed:.2f} s)")
+    print(f"Teoría–teoría: {len(theory_df)} aristas; autor–autor: {len(author_df)} aristas ({args.weighting})")
+    print(theory_df.head(10).to_string(index=False))
@@ -0,0 +1,99 @@
+import json
+import os
+
+# === CHECKPOINT POR TEORÍA ===
+# Cada teoría procesada se agrega como una línea JSON y se fuerza a disco
+# (flush + fsync) antes de pasar a la siguiente. Si el script se cae o se
+# interrumpe con Ctrl-C, las teorías ya escritas no se vuelven a descargar ni
+# a pasar por los modelos al reanudar. process_titles es el bucle por teoría
+# que comparten try6.py y auth2.py.
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+def load_checkpoint(path):
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Línea a medio escribir durante una caída
+                print(f"[Checkpoint] línea incompleta descartada en {path}: {line[:80]!r}")
+                continue
+            records[record["title"]] = record
+    return records
+
+
+def ends_with_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def append_checkpoint(path, record):
+    # Si una caída dejó la última línea cortada, se cierra antes de agregar:
+    # así el registro nuevo no queda pegado al fragmento y no se pierde
+    prefix = "" if ends_with_newline(path) else "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(prefix + json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def reset_checkpoint(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def completed_titles(records):
+    # Las teorías que fallaron se vuelven a intentar al reanudar
+    return {title for title, record in records.items() if record["status"] == "ok"}
+
+
+def pending_titles(titles, records):
+    # Las que todavía no terminaron bien: fallidas o nunca procesadas
+    return set(titles) - completed_titles(records)
+
+
+def mark_done(path, title, result, edges):
+    append_checkpoint(path, {"title": title, "status": "ok", "result": result, "edges": edges})
+
+
+def mark_failed(path, title, error):
+    append_checkpoint(path, {"title": title, "status": "error", "error": str(error)})
+
+
+def collect(records):
+    results, edges = [], []
+    for title in sorted(records):
+        record = records[title]
+        if record["status"] != "ok":
+            continue
+        results.append(record["result"])
+        edges.extend(tuple(edge) for edge in record["edges"])
+    return results, edges
+
+
+def process_titles(path, titles, process):
+    # process(título) -> (resultado, aristas); si lanza una excepción la teoría queda
+    # como fallida y se reintenta en la próxima corrida. Solo se marca como hecha
+    # después de tener el resultado completo.
+    # Devuelve (resultados, aristas, pendientes) leídos de nuevo desde el checkpoint.
+    seen = completed_titles(load_checkpoint(path))
+    if seen:
+        print(f"Reanudando: {len(seen)} teorías ya procesadas en {path}")
+    for title in sorted(set(titles) - seen):
+        try:
+            result, edges = process(title)
+        except Exception as e:
+            print(f"[Error {title}] {e}")
+            mark_failed(path, title, e)
+            continue
+        mark_done(path, title, result, edges)
+    records = load_checkpoint(path)
+    results, edges = collect(records)
+    return results, edges, pending_titles(titles, records)
@@ -0,0 +1,116 @@
+import argparse
+import os
+import pickle
+import re
+import unicodedata
+import pandas as pd
+from scipy.stats import spearmanr
+
+from report import load_runs, run_paths, run_signature, run_order, BASE_DIR, METRICS
+
+CACHE_FILE = ".compare_cache.pkl"
+
+
+# === TÍTULO CANÓNICO ===
+# Las corridas escriben la misma teoría como "string theory", "String theory",
+# "String_theory", etc.
+def canonical_title(title):
+    title = unicodedata.normalize("NFKC", str(title)).replace("_", " ")
+    return re.sub(r'\s+', ' ', title).strip().casefold()
+
+
+# === MATRIZ CONJUNTA ===
+# Filas: teoría canónica. Columnas: (Métrica, Corrida). Se guarda en caché
+# junto con las mtimes que usó report.load_runs.
+def joined_matrix(long, value="Value"):
+    data = long.assign(Canonical=long["Theory"].map(canonical_title))
+    return data.pivot_table(index="Canonical", columns=["Metric", "Run"], values=value,
+                            aggfunc="mean", observed=True)
+
+
+def load_matrix(base_dir=BASE_DIR, use_cache=True):
+    signature = run_signature(run_paths(base_dir))
+    cache = os.path.join(base_dir, CACHE_FILE)
+
+    if use_cache and os.path.exists(cache):
+        with open(cache, "rb") as f:
+            cached = pickle.load(f)
+        if cached["signature"] == signature:
+            return cached["raw"], cached["normalized"]
+
+    long = load_runs(base_dir, use_cache)
+    raw, normalized = joined_matrix(long, "Value"), joined_matrix(long, "Normalized")
+    if use_cache:
+        with open(cache, "wb") as f:
+            pickle.dump({"signature": signature, "raw": raw, "normalized": normalized}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    return raw, normalized
+
+
+# === CORRELACIONES Y DERIVA ===
+# Spearman se calcula sobre las teorías que ambas corridas comparten: primero
+# se alinean los dos vectores y recién después se rankean.
+def spearman(a, b):
+    both = pd.concat([a, b], axis=1).dropna()
+    if len(both) < 2:
+        return float("nan"), len(both)
+    return float(spearmanr(both.iloc[:, 0], both.iloc[:, 1]).statistic), len(both)
+
+
+def rank_correlations(raw, metric):
+    runs = list(raw[metric].columns)
+    matrix = pd.DataFrame(index=runs, columns=runs, dtype=float)
+    for a in runs:
+        for b in runs:
+            matrix.loc[a, b] = spearman(raw[metric][a], raw[metric][b])[0]
+    return matrix
+
+
+def drift(raw, normalized, runs):
+    rows = []
+    for metric in METRICS:
+        for before, after in zip(runs, runs[1:]):
+            both = raw[metric][[before, after]].dropna().index
+            rho, shared = spearman(raw[metric][before], raw[metric][after])
+            rows.append({
+                "Metric": metric,
+                "From": before,
+                "To": after,
+                "Shared": shared,
+                "Spearman": rho,
+                "MeanShift": (raw[metric].loc[both, after] - raw[metric].loc[both, before]).mean(),
+                "MeanAbsNormalizedShift": (normalized[metric].loc[both, after]
+                                           - normalized[metric].loc[both, before]).abs().mean(),
+            })
+    return pd.DataFrame(rows)
+
+
+def top_movers(normalized, metric, before, after, n=10):
+    shift = (normalized[metric][after] - normalized[metric][before]).dropna()
+    return shift.reindex(shift.abs().sort_values(ascending=False).index).head(n)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara las corridas theory*_sentiment_*.csv")
+    parser.add_argument("--out", default="run_drift.csv")
+    parser.add_argument("--movers", type=int, default=5, help="Teorías que más cambian por par de corridas")
+    args = parser.parse_args()
+
+    raw, normalized = load_matrix()
+    runs = sorted(raw[METRICS[0]].columns, key=run_order)
+
+    for metric in METRICS:
+        print(f"\n=== Spearman {metric} ===")
+        print(rank_correlations(raw, metric).round(2).to_string())
+
+    table = drift(raw, normalized, runs)
+    table.to_csv(args.out, index=False, encoding="utf-8")
+    print("\n=== Deriva entre corridas consecutivas ===")
+    print(table.round(3).to_string(index=False))
+
+    for before, after in zip(runs, runs[1:]):
+        for metric in METRICS:
+            movers = top_movers(normalized, metric, before, after, args.movers)
+            if not movers.empty:
+                print(f"\n{metric}: {before} -> {after}")
+                print(movers.round(3).to_string())
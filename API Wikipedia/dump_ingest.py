@@ -0,0 +1,361 @@
+import argparse
+import bz2
+import collections
+import io
+import json
+import multiprocessing as mp
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+
+from wikiapi import preprocess_text, EXCLUDED_SECTIONS
+
+# === INGESTA OFFLINE DESDE EL DUMP XML ===
+# Alternativa a action=parse: se recorre un pages-articles*.xml.bz2 local con
+# iterparse, liberando cada <page> apenas se procesa, y se convierte el
+# wikitexto en la misma estructura lead / secciones / enlaces que usan los
+# scripts. La salida es un JSONL (una página por línea) que se escribe a
+# medida que llegan los resultados, así la memoria no crece con el dump.
+#
+# Con un dump "multistream" y su índice (--index) cada bloque bz2 independiente
+# (~100 páginas) se descomprime y parsea en un worker distinto: el índice
+# garantiza que cada stream empieza en un <page>. Sin índice los streams no se
+# adivinan (un .bz2 de pbzip2 también tiene varios, cortados a mitad de página):
+# la descompresión queda en el proceso principal, que filtra por namespace,
+# título y categoría, y solo la conversión del wikitexto va a los workers.
+SCAN_CHUNK = 16 * 1024 * 1024
+PAGES_PER_TASK = 64
+MAIN_NAMESPACE = "0"
+SKIP_NAMESPACES = ("file", "image", "category", "media", "wikipedia", "help", "template", "portal",
+                   "special", "talk", "user", "draft", "module", "mediawiki")
+
+_HEADING = re.compile(r'^(={2,6})\s*(.*?)\s*\1\s*$', re.MULTILINE)
+_LINK = re.compile(r'\[\[([^\[\]|#]*)(?:#[^\[\]|]*)?(?:\|([^\[\]]*))?\]\]')
+_CATEGORY = re.compile(r'\[\[\s*Category\s*:\s*([^\]|]+)', re.IGNORECASE)
+_TEMPLATE = re.compile(r'\{\{[^{}]*\}\}')
+_TABLE = re.compile(r'\{\|.*?\n\|\}', re.DOTALL)
+_REF = re.compile(r'<ref[^>/]*/>|<ref[^>]*>.*?</ref>', re.DOTALL | re.IGNORECASE)
+_MATH = re.compile(r'<(math|chem|score|syntaxhighlight|gallery)[^>]*>.*?</\1>', re.DOTALL | re.IGNORECASE)
+_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_TAG = re.compile(r'<[^>]+>')
+_EXTERNAL = re.compile(r'\[(?:https?:)?//[^\s\]]+\s*([^\]]*)\]')
+_EMPHASIS = re.compile(r"'{2,}")
+_LIST_MARK = re.compile(r'^[*#:;]+\s*', re.MULTILINE)
+
+
+def canonical_title(title):
+    # Misma forma que en la API: espacios en vez de guiones bajos y primera letra en mayúscula
+    title = re.sub(r'[\s_]+', ' ', title).strip()
+    return title[:1].upper() + title[1:]
+
+
+# === WIKITEXTO ===
+def is_article_link(target):
+    prefix, _, rest = target.partition(":")
+    return not (rest and prefix.strip().lower() in SKIP_NAMESPACES)
+
+
+def extract_links(wikitext):
+    links = {canonical_title(m.group(1)) for m in _LINK.finditer(wikitext)
+             if m.group(1).strip() and is_article_link(m.group(1))}
+    return sorted(links)
+
+
+def extract_categories(wikitext):
+    return sorted({canonical_title(c) for c in _CATEGORY.findall(wikitext)})
+
+
+def _replace_link(match):
+    target, label = match.group(1), match.group(2)
+    if not is_article_link(target):
+        return ""
+    return label if label is not None else target
+
+
+def wikitext_to_text(wikitext):
+    text = _COMMENT.sub("", wikitext)
+    text = _REF.sub("", text)
+    text = _MATH.sub("", text)
+    # Plantillas anidadas: se eliminan de adentro hacia afuera
+    previous = None
+    while previous != text:
+        previous, text = text, _TEMPLATE.sub("", text)
+    text = _TABLE.sub("", text)
+    # Enlaces: [[Destino|texto]] -> texto; archivos y categorías se descartan
+    # (los enlaces internos en el pie de una imagen se resuelven primero)
+    previous = None
+    while previous != text:
+        previous, text = text, _LINK.sub(_replace_link, text)
+    text = _EXTERNAL.sub(r"\1", text)
+    text = _TAG.sub("", text)
+    text = _EMPHASIS.sub("", text)
+    text = _LIST_MARK.sub("", text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def split_sections(wikitext):
+    # Devuelve (lead, [(nivel, título, wikitexto)]) cortando en cada encabezado
+    headings = list(_HEADING.finditer(wikitext))
+    lead = wikitext[:headings[0].start()] if headings else wikitext
+    sections = []
+    for i, h in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(wikitext)
+        sections.append((len(h.group(1)), h.group(2).strip(), wikitext[h.end():end]))
+    return lead, sections
+
+
+def wikitext_to_page(title, wikitext, page_id=None, revid=None, excluded=EXCLUDED_SECTIONS):
+    lead, raw_sections = split_sections(wikitext)
+    sections, skip_level = [], None
+    for level, line, body in raw_sections:
+        # Las subsecciones de una sección excluida también se excluyen
+        if skip_level is not None and level > skip_level:
+            continue
+        skip_level = level if line in excluded else None
+        if skip_level is None:
+            sections.append({"line": line, "level": level, "text": wikitext_to_text(body)})
+    return {
+        "title": title,
+        "id": page_id,
+        "revid": revid,
+        "lead": wikitext_to_text(lead),
+        "sections": sections,
+        "links": extract_links(wikitext),
+        "categories": extract_categories(wikitext),
+    }
+
+
+def page_text(page):
+    # Equivalente a extract_all_sections: lead + secciones no excluidas, limpio
+    return preprocess_text(" ".join([page["lead"]] + [s["text"] for s in page["sections"]]))
+
+
+# === XML ===
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_pages(source):
+    # source: archivo binario (o BytesIO) con XML de MediaWiki. Cada <page> se
+    # limpia al terminar y se suelta del elemento raíz: memoria constante.
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or local_name(elem.tag) != "page":
+            continue
+        page = {"title": None, "ns": None, "id": None, "redirect": False, "revid": None, "text": ""}
+        for child in elem:
+            name = local_name(child.tag)
+            if name in ("title", "ns", "id"):
+                page[name] = child.text
+            elif name == "redirect":
+                page["redirect"] = True
+            elif name == "revision":
+                for rev in child:
+                    rev_name = local_name(rev.tag)
+                    if rev_name == "id":
+                        page["revid"] = rev.text
+                    elif rev_name == "text":
+                        page["text"] = rev.text or ""
+        elem.clear()
+        root.clear()
+        yield page
+
+
+def wanted(page, titles=None, category=None):
+    if page["ns"] != MAIN_NAMESPACE or page["redirect"] or not page["title"]:
+        return False
+    if titles is not None and page["title"] not in titles:
+        return False
+    if category is not None and category not in extract_categories(page["text"]):
+        return False
+    return True
+
+
+def convert(page, excluded=EXCLUDED_SECTIONS):
+    pid = int(page["id"]) if page["id"] else None
+    revid = int(page["revid"]) if page["revid"] else None
+    return wikitext_to_page(page["title"], page["text"], pid, revid, excluded)
+
+
+# === STREAMS BZ2 ===
+def read_index(index_path):
+    # Índice del dump multistream: "offset:page_id:título" por línea
+    opener = bz2.open if index_path.endswith(".bz2") else open
+    with opener(index_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            offset, _, rest = line.rstrip("\n").partition(":")
+            _, _, title = rest.partition(":")
+            yield int(offset), title
+
+
+def streams_from_index(path, index_path, titles=None):
+    offsets, selected = set(), set()
+    for offset, title in read_index(index_path):
+        offsets.add(offset)
+        if titles is None or title in titles:
+            selected.add(offset)
+    ordered = sorted(offsets) + [os.path.getsize(path)]
+    ends = dict(zip(ordered, ordered[1:]))
+    return [(offset, ends[offset]) for offset in sorted(selected)]
+
+
+def decompress_range(path, start, end):
+    # Descomprime un solo stream; si termina después de `end` se sigue leyendo hasta su final real
+    out, decompressor = [], bz2.BZ2Decompressor()
+    with open(path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+        while raw and not decompressor.eof:
+            out.append(decompressor.decompress(raw))
+            raw = f.read(SCAN_CHUNK) if not decompressor.eof else b""
+    return b"".join(out)
+
+
+def stream_pages(data):
+    # Un stream del multistream trae <page>...</page> sueltos (el primero trae
+    # además <siteinfo>); se envuelven en una raíz para poder usar iterparse.
+    first, last = data.find(b"<page>"), data.rfind(b"</page>")
+    if first < 0 or last < 0:
+        return
+    body = data[first:last + len(b"</page>")]
+    yield from iter_pages(io.BytesIO(b"<pages>" + body + b"</pages>"))
+
+
+# === WORKERS ===
+_filters = {}
+
+
+def init_worker(titles, category, excluded):
+    _filters.update(titles=titles, category=category, excluded=excluded)
+
+
+def process_stream(task):
+    # (páginas, leídas, falla): un stream truncado o corrupto vuelve con sus offsets
+    # en vez de perder sus ~100 páginas en silencio
+    path, start, end = task
+    try:
+        data = decompress_range(path, start, end)
+    except (OSError, EOFError) as e:
+        return [], 0, (start, end, f"{type(e).__name__}: {e}")
+    results, seen = [], 0
+    for page in stream_pages(data):
+        seen += 1
+        if wanted(page, _filters["titles"], _filters["category"]):
+            results.append(convert(page, _filters["excluded"]))
+    return results, seen, None
+
+
+def process_pages(task):
+    # Las páginas ya vienen filtradas por el proceso principal
+    pages, seen = task
+    return [convert(page, _filters["excluded"]) for page in pages], seen, None
+
+
+def filtered_chunks(pages, size, titles=None, category=None):
+    # (páginas buscadas, páginas leídas) por tarea: lo descartado no se serializa hacia los workers
+    chunk, seen = [], 0
+    for page in pages:
+        seen += 1
+        if wanted(page, titles, category):
+            chunk.append(page)
+            if len(chunk) == size:
+                yield chunk, seen
+                chunk, seen = [], 0
+    if chunk or seen:
+        yield chunk, seen
+
+
+def bounded_imap(pool, func, tasks, window):
+    # Como pool.imap pero sin adelantar más de `window` tareas: Pool.imap consume
+    # todo el iterador de entrada y con un dump de un solo stream eso cargaría
+    # las páginas en memoria más rápido de lo que los workers las procesan.
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def ingest(path, out_path, titles=None, category=None, workers=None, index_path=None,
+           excluded=EXCLUDED_SECTIONS, skip_corrupt=False):
+    # skip_corrupt: seguir si un stream no se puede descomprimir (queda en stats["corrupt"]);
+    # por defecto se aborta, así un dump truncado no deja un JSONL que parece completo
+    titles = {canonical_title(t) for t in titles} if titles else None
+    category = canonical_title(category) if category else None
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+
+    streams = streams_from_index(path, index_path, titles) if index_path else []
+
+    stats = {"pages": 0, "kept": 0, "streams": len(streams), "corrupt": []}
+    start = time.perf_counter()
+    with open(out_path, "w", encoding="utf-8") as out, \
+            mp.Pool(workers, initializer=init_worker, initargs=(titles, category, excluded)) as pool:
+        if index_path:
+            results = bounded_imap(pool, process_stream, ((path, s, e) for s, e in streams), window)
+        else:
+            # Sin índice (o XML sin comprimir): descompresión y filtro secuenciales aquí
+            opener = bz2.open if path.endswith(".bz2") else open
+            source = opener(path, "rb")
+            tasks = filtered_chunks(iter_pages(source), PAGES_PER_TASK, titles, category)
+            results = bounded_imap(pool, process_pages, tasks, window)
+        for pages, seen, failure in results:
+            if failure is not None:
+                if not skip_corrupt:
+                    raise RuntimeError(f"Stream bz2 corrupto en bytes {failure[0]}-{failure[1]} de {path}: "
+                                       f"{failure[2]} (usar --skip-corrupt para seguir)")
+                print(f"[Stream omitido] bytes {failure[0]}-{failure[1]}: {failure[2]}")
+                stats["corrupt"].append(failure)
+            stats["pages"] += seen
+            for page in pages:
+                out.write(json.dumps(page, ensure_ascii=False) + "\n")
+                stats["kept"] += 1
+                if titles is not None:
+                    titles.discard(page["title"])
+    stats["seconds"] = time.perf_counter() - start
+    stats["missing"] = sorted(titles) if titles is not None else []
+    return stats
+
+
+# === LECTURA DEL RESULTADO ===
+def load_pages(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def load_corpus(path):
+    # {título: texto limpio}, listo para analyze_text
+    return {page["title"]: page_text(page) for page in load_pages(path)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta de páginas desde un dump XML de Wikipedia")
+    parser.add_argument("dump", help="pages-articles*.xml.bz2 (o un extracto .xml)")
+    parser.add_argument("--out", default="dump_pages.jsonl")
+    parser.add_argument("--titles", help="archivo con un título por línea")
+    parser.add_argument("--category", help="quedarse solo con las páginas de esta categoría")
+    parser.add_argument("--index", help="índice del dump multistream (…-index.txt.bz2)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--skip-corrupt", action="store_true",
+                        help="omitir los streams bz2 que no se pueden descomprimir en vez de abortar")
+    args = parser.parse_args()
+
+    titles = None
+    if args.titles:
+        with open(args.titles, encoding="utf-8") as f:
+            titles = [line.strip() for line in f if line.strip()]
+
+    stats = ingest(args.dump, args.out, titles, args.category, args.workers, args.index,
+                   skip_corrupt=args.skip_corrupt)
+    print(f"{stats['kept']} de {stats['pages']} páginas en {stats['seconds']:.1f} s "
+          f"({stats['streams']} streams bz2) -> {args.out}")
+    if stats["corrupt"]:
+        print(f"{len(stats['corrupt'])} streams corruptos omitidos: "
+              f"{', '.join(f'{s}-{e}' for s, e, _ in stats['corrupt'][:20])}")
+    if stats["missing"]:
+        print(f"No encontradas ({len(stats['missing'])}): {', '.join(stats['missing'][:20])}")
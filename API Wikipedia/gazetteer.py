@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+
+import instrument
+from wikiapi import get_json
+
+# === GAZETTEER DE FÍSICOS (AHO–CORASICK) ===
+# Lista de físicos conocidos sacada de Wikidata (ocupación físico o una
+# subclase, con etiqueta y alias en inglés) y guardada en un JSON local. Con
+# todos los nombres se arma un autómata de Aho–Corasick que recorre el texto
+# del artículo una sola vez y devuelve cada nombre encontrado con su etiqueta
+# canónica, sin importar cuántos nombres tenga la lista.
+# La comparación es sin mayúsculas ni acentos ("Schrödinger" == "schrodinger")
+# y solo cuenta en límites de palabra. El NER queda para las oraciones que
+# todavía tienen palabras capitalizadas fuera de los nombres encontrados.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GAZETTEER_FILE = os.path.join(BASE_DIR, "physicists_gazetteer.json")
+SPARQL_URL = "https://query.wikidata.org/sparql"
+PHYSICIST = "Q169470"
+MIN_WORDS = 2  # los apellidos sueltos ("Planck", "Bose") dan demasiados falsos positivos
+ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "prof", "st", "jr", "sr", "vs", "al", "etc", "e.g", "i.e", "cf", "fig",
+                 "eq", "vol", "ed", "eds"}
+
+PHYSICISTS_QUERY = """
+SELECT ?person ?label ?alias WHERE {
+  ?person wdt:P31 wd:Q5 ;
+          wdt:P106/wdt:P279* wd:%s ;
+          rdfs:label ?label .
+  FILTER(LANG(?label) = "en")
+  OPTIONAL { ?person skos:altLabel ?alias . FILTER(LANG(?alias) = "en") }
+}
+"""
+
+
+# === LISTA DE NOMBRES (WIKIDATA + CACHÉ LOCAL) ===
+def fetch_physicists(occupation=PHYSICIST):
+    # {QID: {"label": etiqueta en inglés, "aliases": [...]}}
+    res = get_json(SPARQL_URL, {"query": PHYSICISTS_QUERY % occupation, "format": "json"})
+    people = {}
+    for row in res["results"]["bindings"]:
+        qid = row["person"]["value"].rsplit("/", 1)[-1]
+        entry = people.setdefault(qid, {"label": row["label"]["value"], "aliases": []})
+        alias = row.get("alias", {}).get("value")
+        if alias and alias not in entry["aliases"]:
+            entry["aliases"].append(alias)
+    return people
+
+
+def save_gazetteer(people, path=GAZETTEER_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"fetched": time.strftime("%Y-%m-%d"), "occupation": PHYSICIST, "people": people},
+                  f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load_gazetteer(path=GAZETTEER_FILE, refresh=False):
+    # Usa la caché local; solo consulta Wikidata si no existe o con refresh=True
+    if refresh or not os.path.exists(path):
+        save_gazetteer(fetch_physicists(), path)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["people"]
+
+
+def gazetteer_names(people, min_words=MIN_WORDS):
+    # {variante del nombre: etiqueta canónica}; una variante ambigua queda con la primera etiqueta
+    names = {}
+    for qid in sorted(people):
+        entry = people[qid]
+        for name in [entry["label"]] + entry["aliases"]:
+            name = name.strip()
+            if len(name.split()) >= min_words and not re.search(r'\d', name):
+                names.setdefault(name, entry["label"])
+    return names
+
+
+# === NORMALIZACIÓN ===
+@lru_cache(maxsize=None)
+def fold_char(c):
+    # Minúscula sin diacríticos, siempre de un carácter para que las posiciones coincidan
+    base = unicodedata.normalize("NFKD", c)[0].lower()
+    return base if len(base) == 1 else c
+
+
+def fold(text):
+    return "".join(map(fold_char, text))
+
+
+# === AUTÓMATA ===
+def build_automaton(names):
+    # goto: lista de {carácter: estado}; fail: estado de falla; out: patrones que terminan en el estado
+    goto, fail, out = [{}], [0], [[]]
+    patterns = []
+    for name, canonical in names.items():
+        key = re.sub(r'\s+', ' ', fold(name))
+        state = 0
+        for c in key:
+            nxt = goto[state].get(c)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][c] = nxt
+                goto.append({})
+                fail.append(0)
+                out.append([])
+            state = nxt
+        out[state].append(len(patterns))
+        patterns.append((len(key), canonical))
+
+    # Enlaces de falla por BFS; cada estado hereda las salidas de su estado de falla
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for c, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and c not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(c, 0)
+            out[nxt] = out[nxt] + out[fail[nxt]]
+    return {"goto": goto, "fail": fail, "out": out, "patterns": patterns}
+
+
+def load_automaton(path=GAZETTEER_FILE, refresh=False, min_words=MIN_WORDS):
+    return build_automaton(gazetteer_names(load_gazetteer(path, refresh), min_words))
+
+
+def optional_automaton(mode, path=GAZETTEER_FILE):
+    # None con mode "off" o si la lista no se puede descargar (WDQS suele cortar la
+    # consulta por tiempo): los scripts siguen solo con NER
+    if mode == "off":
+        return None
+    try:
+        return load_automaton(path)
+    except Exception as e:
+        print(f"[gazetteer] Sin lista de físicos ({e}); se usa solo NER")
+        return None
+
+
+# === BÚSQUEDA ===
+@instrument.timed("gazetteer")
+def find_spans(text, automaton):
+    # [(inicio, fin, etiqueta)] sin solapamientos, prefiriendo la coincidencia más larga
+    goto, fail, out, patterns = automaton["goto"], automaton["fail"], automaton["out"], automaton["patterns"]
+    folded = re.sub(r'\s', ' ', fold(text))
+    hits = []
+    scanned = []  # posición en el texto de cada carácter recorrido (los espacios repetidos cuentan una vez)
+    state = 0
+    for i, c in enumerate(folded):
+        if c == ' ' and i and folded[i - 1] == ' ':
+            continue
+        scanned.append(i)
+        while state and c not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(c, 0)
+        for p in out[state]:
+            length, canonical = patterns[p]
+            start, end = scanned[-length], i + 1
+            if (start == 0 or not folded[start - 1].isalnum()) and (end == len(folded) or not folded[end].isalnum()):
+                hits.append((start, end, canonical))
+    hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+    spans, last = [], 0
+    for start, end, canonical in hits:
+        if start >= last:
+            spans.append((start, end, canonical))
+            last = end
+    return spans
+
+
+def match_authors(text, automaton):
+    return {canonical for _, _, canonical in find_spans(text, automaton)}
+
+
+_SENTENCE_END = re.compile(r'[.!?]+(?=\s|$)')
+_WORD = re.compile(r'[^\W\d_][\w\'-]+')
+
+
+def is_abbreviation(token):
+    # "A." / "J.R.R." (iniciales) o una abreviatura conocida: el punto no cierra la oración
+    token = token.lstrip("(\"'[")
+    if re.fullmatch(r'(?:[^\W\d_]\.)*[^\W\d_]', token) and token.replace(".", "").isupper():
+        return True
+    return token.lower() in ABBREVIATIONS
+
+
+def split_sentences(text):
+    # [(inicio, oración)] cortando en . ! ? seguidos de espacio, salvo después de iniciales y abreviaturas
+    sentences, start = [], 0
+    for m in _SENTENCE_END.finditer(text):
+        before = text[start:m.start()].rsplit(None, 1)
+        if m.group() == "." and before and is_abbreviation(before[-1]):
+            continue
+        sentences.append((start, text[start:m.end()]))
+        start = m.end()
+    if text[start:].strip():
+        sentences.append((start, text[start:]))
+    return sentences
+
+
+def ner_remainder(text, spans):
+    # Oraciones con alguna palabra capitalizada (salvo la que abre la oración) fuera de los nombres encontrados
+    starts = [s for s, _, _ in spans]
+    keep = []
+    for offset, sentence in split_sentences(text):
+        opening = len(sentence) - len(sentence.lstrip(" \t\n\"'(["))
+        for w in _WORD.finditer(sentence):
+            if w.start() == opening or not w.group()[0].isupper():
+                continue
+            pos = offset + w.start()
+            k = bisect_right(starts, pos) - 1
+            if k < 0 or pos >= spans[k][1]:
+                keep.append(sentence.strip())
+                break
+    return " ".join(keep)
+
+
+def find_people(text, automaton, ner=None, remainder_only=True):
+    # Gazetteer sobre todo el texto y NER (opcional) sobre lo que no resolvió
+    spans = find_spans(text, automaton)
+    people = {canonical for _, _, canonical in spans}
+    if ner is not None:
+        rest = ner_remainder(text, spans) if remainder_only else text
+        if rest:
+            people |= {p for p in ner(rest) if p}
+    return people
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gazetteer de físicos (Wikidata) con búsqueda Aho–Corasick")
+    parser.add_argument("files", nargs="*", help="archivos de texto a escanear (por defecto stdin)")
+    parser.add_argument("--refresh", action="store_true", help="volver a descargar la lista desde Wikidata")
+    parser.add_argument("--gazetteer", default=GAZETTEER_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    names = gazetteer_names(load_gazetteer(args.gazetteer, args.refresh))
+    automaton = build_automaton(names)
+    print(f"{len(names)} nombres, {len(automaton['goto'])} estados ({time.perf_counter() - start:.2f} s)")
+
+    texts = [open(p, encoding="utf-8").read() for p in args.files] if args.files else [sys.stdin.read()]
+    for name, text in zip(args.files or ["<stdin>"], texts):
+        start = time.perf_counter()
+        spans = find_spans(text, automaton)
+        elapsed = time.perf_counter() - start
+        rest = ner_remainder(text, spans)
+        print(f"{name}: {len(text)} caracteres en {1000 * elapsed:.1f} ms, "
+              f"{len({c for _, _, c in spans})} autores, {len(rest)} caracteres quedan para NER")
+        for canonical in sorted({c for _, _, c in spans}):
+            print(f"  {canonical}")
@@ -0,0 +1,120 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# === INSTRUMENTACIÓN ===
+# Temporizadores por etapa (http, parse, clean, sentiment, embedding, ner,
+# wikidata), contadores (requests, bytes, tokens) y un reporte al final.
+# Se activa con PIPELINE_TRACE=1 o enable(); apagada, stage() devuelve un
+# contexto nulo compartido y timed()/count() solo consultan ENABLED.
+ENABLED = os.environ.get("PIPELINE_TRACE", "") not in ("", "0")
+
+_NULL = contextlib.nullcontext()
+_origin = time.perf_counter()
+_lock = threading.Lock()
+totals = {}     # etapa -> [llamadas, segundos]
+counters = {}   # nombre -> valor
+events = []     # (etapa, inicio, duración, hilo) para el trace
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    totals.clear()
+    counters.clear()
+    events.clear()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            total = totals.setdefault(self.name, [0, 0.0])
+            total[0] += 1
+            total[1] += elapsed
+            events.append((self.name, self.start - _origin, elapsed, threading.get_ident()))
+        return False
+
+
+def stage(name):
+    return _Stage(name) if ENABLED else _NULL
+
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    if ENABLED:
+        with _lock:
+            counters[name] = counters.get(name, 0) + value
+
+
+def count_tokens(name, tokenizer, text):
+    # Tokeniza otra vez solo para contar; no cuesta nada con la traza apagada
+    if ENABLED:
+        count(f"tokens.{name}", len(tokenizer(text, truncation=False)["input_ids"]))
+
+
+# === REPORTE ===
+def report():
+    wall = time.perf_counter() - _origin
+    lines = [f"{'Etapa':<14}{'Llamadas':>10}{'Total (s)':>12}{'Media (ms)':>12}{'% pared':>9}"]
+    for name, (calls, seconds) in sorted(totals.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{name:<14}{calls:>10}{seconds:>12.2f}{1000 * seconds / calls:>12.1f}"
+                     f"{100 * seconds / wall:>8.1f}%")
+    lines.append(f"{'(pared)':<14}{'':>10}{wall:>12.2f}")
+    if counters:
+        lines.append("")
+        for name, value in sorted(counters.items()):
+            lines.append(f"{name:<24}{value:>14,}")
+    return "\n".join(lines)
+
+
+def write_trace(path):
+    data = {
+        "wall_seconds": time.perf_counter() - _origin,
+        "stages": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in totals.items()},
+        "counters": counters,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+# Formato Chrome trace (chrome://tracing o https://ui.perfetto.dev)
+def write_chrome_trace(path):
+    trace = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": os.getpid(), "tid": tid}
+             for name, start, duration, tid in events]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace}, f)
+
+
+def finish_trace(out_dir):
+    if not ENABLED:
+        return
+    print("\n" + report())
+    write_trace(os.path.join(out_dir, "trace.json"))
+    write_chrome_trace(os.path.join(out_dir, "trace.chrome.json"))
@@ -61,29 +61,10 @@ print('GET PLAIN TEXT: ',get_intro_text(TITLE))
 #Get all internal links (to other Wikipedia pages)
 ###########################################################################################
 
-def get_internal_links(title):
-    links = []
-    params = {
-        "action": "query",
-        "format": "json",
-        "titles": title,
-        "prop": "links",
-        "pllimit": "max"  # max per request
-    }
-
-    while True:
-        r = requests.get(API_URL, params=params).json()
-        page = next(iter(r["query"]["pages"].values()))
-        links.extend([link["title"] for link in page.get("links", [])])
-
-        if "continue" in r:
-            params.update(r["continue"])
-        else:
-            break
-
-    return links
+# Versión en lote (hasta 50 títulos por petición, con continuación) en wikiapi.py
+from wikiapi import get_internal_links
 
-links = get_internal_links(TITLE)
+links = sorted(get_internal_links([TITLE]).get(TITLE, set()))
 print("Get all internal links (to other Wikipedia pages)")
 print(f"Found {len(links)} internal links")
 print(links[:10])  # sample
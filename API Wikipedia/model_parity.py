@@ -0,0 +1,94 @@
+import argparse
+import json
+import time
+import numpy as np
+
+import wikiapi
+from benchmark import FIXTURES, TITLE, TARGET_SECTIONS, stage_fetch, stage_parse, stage_clean
+from models import load_sentiment, load_ner, load_embedder, SENTIMENT_MODEL, EMBEDDING_MODEL, NER_MODEL
+
+# === CONFIGURACIÓN ===
+SENTIMENT_CHARS = 512
+NER_CHUNK = 800
+
+# Tolerancias para aceptar el backend cuantizado
+MIN_LABEL_AGREEMENT = 0.95
+MIN_COSINE = 0.98
+MIN_NER_JACCARD = 0.85
+
+
+# === CORPUS EN CACHÉ ===
+# Los textos salen del zip de fixtures de benchmark.py, sin red.
+def load_corpus(archive_path=FIXTURES):
+    replay = wikiapi.replay_transport(archive_path)
+    wikiapi.set_transport(replay)
+    try:
+        titles = sorted(wikiapi.get_theory_titles(TITLE, TARGET_SECTIONS))
+        return stage_clean(stage_parse(stage_fetch(titles)))
+    finally:
+        replay.archive.close()
+        wikiapi.set_transport(None)
+
+
+def run_backend(backend, texts):
+    sentiment_pipeline = load_sentiment(SENTIMENT_MODEL, backend)
+    embedder = load_embedder(EMBEDDING_MODEL, backend)
+    ner_pipeline = load_ner(NER_MODEL, backend)
+    timings = {}
+
+    start = time.perf_counter()
+    sentiment = sentiment_pipeline([t[:SENTIMENT_CHARS] for t in texts])
+    timings["sentiment"] = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    embeddings = np.asarray(embedder.encode(texts))
+    timings["embedding"] = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    chunks = [text[i:i + NER_CHUNK] for text in texts for i in range(0, len(text), NER_CHUNK)]
+    entities = ner_pipeline(chunks) if chunks else []
+    timings["ner"] = len(chunks) / (time.perf_counter() - start)
+
+    people = {ent["word"].strip() for chunk in entities for ent in chunk if ent["entity_group"] == "PER"}
+    return {"sentiment": sentiment, "embeddings": embeddings, "people": people, "throughput": timings}
+
+
+# === PARIDAD ===
+def parity(reference, candidate):
+    labels = np.mean([a["label"] == b["label"] for a, b in zip(reference["sentiment"], candidate["sentiment"])])
+    score_diff = np.mean([abs(a["score"] - b["score"]) for a, b in zip(reference["sentiment"], candidate["sentiment"])])
+    ref, cand = reference["embeddings"], candidate["embeddings"]
+    cosine = (ref * cand).sum(axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1))
+    union = reference["people"] | candidate["people"]
+    jaccard = len(reference["people"] & candidate["people"]) / len(union) if union else 1.0
+    return {
+        "sentiment_label_agreement": float(labels),
+        "sentiment_mean_abs_score_diff": float(score_diff),
+        "embedding_min_cosine": float(cosine.min()),
+        "embedding_mean_cosine": float(cosine.mean()),
+        "ner_person_jaccard": float(jaccard),
+        "ok": bool(labels >= MIN_LABEL_AGREEMENT and cosine.min() >= MIN_COSINE and jaccard >= MIN_NER_JACCARD),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paridad y rendimiento torch vs ONNX int8")
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--out", default="model_parity.json")
+    args = parser.parse_args()
+
+    texts = list(load_corpus(args.fixtures).values())
+    print(f"{len(texts)} textos del corpus en caché")
+    reference = run_backend("torch", texts)
+    candidate = run_backend("onnx", texts)
+    report = {
+        "parity": parity(reference, candidate),
+        "throughput": {"torch": reference["throughput"], "onnx": candidate["throughput"]},
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report["parity"], indent=2))
+    for stage in ("sentiment", "embedding", "ner"):
+        torch_rate, onnx_rate = reference["throughput"][stage], candidate["throughput"][stage]
+        print(f"{stage:<10} torch {torch_rate:8.1f}/s  onnx {onnx_rate:8.1f}/s  ({onnx_rate / torch_rate:.2f}x)")
@@ -0,0 +1,116 @@
+import os
+import numpy as np
+
+# === BACKENDS DE INFERENCIA ===
+# "torch": pipelines de transformers / SentenceTransformer en precisión completa.
+# "onnx":  los mismos modelos exportados a ONNX Runtime con cuantización int8
+#          dinámica (optimum). La exportación se hace una vez y queda en ONNX_DIR.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ONNX_DIR = os.path.join(BASE_DIR, "onnx_models")
+BACKENDS = ("torch", "onnx")
+QUANTIZED_FILE = "model_quantized.onnx"
+QUANTIZATION = {"torch": "fp32", "onnx": "int8-dynamic-avx2"}  # lo que produce cada backend
+
+# Modelos del pipeline principal (try6); model_parity.py valida estos mismos
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+NER_MODEL = "allenai/scibert_scivocab_uncased"
+
+
+def hub_id(model_id):
+    # SentenceTransformer acepta "all-MiniLM-L6-v2"; optimum necesita el id completo
+    return model_id if "/" in model_id else f"sentence-transformers/{model_id}"
+
+
+def ort_class(task):
+    from optimum.onnxruntime import (ORTModelForSequenceClassification, ORTModelForTokenClassification,
+                                     ORTModelForFeatureExtraction)
+    return {"sentiment-analysis": ORTModelForSequenceClassification,
+            "ner": ORTModelForTokenClassification,
+            "feature-extraction": ORTModelForFeatureExtraction}[task]
+
+
+def export_quantized(model_id, task):
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    out_dir = os.path.join(ONNX_DIR, hub_id(model_id).replace("/", "__"))
+    if os.path.exists(os.path.join(out_dir, QUANTIZED_FILE)):
+        return out_dir
+
+    print(f"[onnx] Exportando y cuantizando {model_id} en {out_dir}")
+    model = ort_class(task).from_pretrained(hub_id(model_id), export=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(hub_id(model_id)).save_pretrained(out_dir)
+    quantizer = ORTQuantizer.from_pretrained(out_dir)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+    return out_dir
+
+
+def load_ort(model_id, task):
+    from transformers import AutoTokenizer
+    out_dir = export_quantized(model_id, task)
+    model = ort_class(task).from_pretrained(out_dir, file_name=QUANTIZED_FILE)
+    return model, AutoTokenizer.from_pretrained(out_dir)
+
+
+# === EMBEDDINGS ONNX ===
+# Reproduce all-MiniLM-L6-v2 de SentenceTransformer: mean pooling sobre la
+# máscara de atención y normalización L2. Expone encode() y tokenizer igual que
+# SentenceTransformer para poder reemplazarlo en los scripts.
+class OnnxEmbedder:
+    def __init__(self, model_id, max_length=256):
+        self.model, self.tokenizer = load_ort(model_id, "feature-extraction")
+        self.max_length = max_length
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        vectors = []
+        for i in range(0, len(sentences), batch_size):
+            batch = self.tokenizer(sentences[i:i + batch_size], padding=True, truncation=True,
+                                   max_length=self.max_length, return_tensors="np")
+            hidden = self.model(**batch).last_hidden_state
+            hidden = hidden.numpy() if hasattr(hidden, "numpy") else np.asarray(hidden)
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            vectors.append(pooled / np.linalg.norm(pooled, axis=1, keepdims=True))
+        vectors = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+# === CARGA SEGÚN BACKEND ===
+def load_sentiment(model_id, backend="torch"):
+    from transformers import pipeline
+    if backend == "onnx":
+        model, tokenizer = load_ort(model_id, "sentiment-analysis")
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    return pipeline("sentiment-analysis", model=model_id)
+
+
+def load_ner(model_id, backend="torch"):
+    from transformers import pipeline
+    if backend == "onnx":
+        model, tokenizer = load_ort(model_id, "ner")
+        return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    return pipeline("ner", model=model_id, aggregation_strategy="simple")
+
+
+def load_embedder(model_id, backend="torch"):
+    if backend == "onnx":
+        return OnnxEmbedder(model_id)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_id)
+
+
+def model_key(model_id, backend="torch"):
+    # Identifica los vectores de una caché: el mismo modelo en int8 no da los mismos números que en fp32
+    return f"{model_id}|{check_backend(backend)}|{QUANTIZATION[backend]}"
+
+
+def check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido '{backend}', usar uno de {BACKENDS}")
+    return backend
@@ -0,0 +1,146 @@
+import multiprocessing as mp
+import os
+import numpy as np
+
+from wikiapi import calculate_readability
+
+# === EJECUTOR MULTIPROCESO ===
+# Cada proceso carga su propia réplica de los modelos una sola vez (initializer)
+# y toma lotes de documentos de la cola de tareas del Pool. Los hilos de
+# torch/BLAS se fijan por proceso para que workers * hilos no supere los núcleos.
+# Con "fork" numpy ya está cargado en el padre y las variables de entorno no
+# alcanzan al BLAS ya inicializado; por eso además se limita con threadpoolctl.
+# Los resultados vuelven como arreglos float32 compactos, no como objetos por texto.
+# Si un lote falla se reintenta documento por documento y los que vuelven a
+# fallar llegan con su mensaje en "errors" (el resto del lote no se pierde).
+#
+# Se usa "fork" por defecto porque try6.py es un script sin guarda __main__ y
+# "spawn"/"forkserver" lo volverían a ejecutar en cada worker. El proceso padre
+# no debe haber cargado los modelos (ni inicializado los hilos de torch) antes.
+START_METHOD = "fork"
+_models = {}
+
+
+def threads_per_worker(workers):
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def pin_threads(threads):
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+
+def init_worker(config, threads):
+    pin_threads(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        _models["blas_limits"] = threadpool_limits(threads)
+    except ImportError:
+        pass
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    from models import load_sentiment, load_ner, load_embedder
+    backend = config.get("backend", "torch")
+    _models["config"] = config
+    _models["sentiment"] = load_sentiment(config["sentiment"], backend)
+    _models["embedder"] = load_embedder(config["embedding"], backend)
+    _models["ner"] = load_ner(config["ner"], backend) if config.get("ner") else None
+
+
+def analyze_texts(texts, ner_texts):
+    config = _models["config"]
+    sentiment_chars = config.get("sentiment_chars", 512)
+    ner_chunk = config.get("ner_chunk", 800)
+
+    results = _models["sentiment"]([t[:sentiment_chars] for t in texts], truncation=True)
+    polarity = np.array([r["score"] if r["label"] == "POSITIVE" else -r["score"] for r in results], dtype=np.float32)
+    if config.get("embedding_mode") == "sentence":
+        from models import model_key
+        from sentence_embeddings import embed_documents
+        key = model_key(config["embedding"], config.get("backend", "torch"))
+        stats, _ = embed_documents(texts, _models["embedder"], key)
+        dim = next((st["centroid"].shape[0] for st in stats if st["centroid"] is not None), 0)
+        embeddings = np.array([st["centroid"] if st["centroid"] is not None else np.zeros(dim) for st in stats],
+                              dtype=np.float32)
+        dispersion = np.array([st["dispersion"] for st in stats], dtype=np.float32)
+    else:
+        embeddings = np.asarray(_models["embedder"].encode(texts), dtype=np.float32)
+        dispersion = embeddings.std(axis=1)
+    readability = np.array([calculate_readability(t) for t in texts], dtype=np.float32)
+
+    people = [[] for _ in texts]
+    if _models["ner"] is not None:
+        chunks, owners = [], []
+        # ner_texts: solo lo que el gazetteer no resolvió (o el texto completo)
+        for j, text in enumerate(texts if ner_texts is None else ner_texts):
+            for i in range(0, len(text), ner_chunk):
+                chunks.append(text[i:i + ner_chunk])
+                owners.append(j)
+        entities = _models["ner"](chunks) if chunks else []
+        for owner, chunk_entities in zip(owners, entities):
+            people[owner].extend(ent["word"].strip().title() for ent in chunk_entities
+                                 if ent["entity_group"] == "PER" and len(ent["word"]) > 2)
+    return polarity, embeddings, dispersion, readability, [sorted(set(p)) for p in people]
+
+
+def analyze_batch(task):
+    indices, texts, ner_texts = task
+    try:
+        return (indices,) + analyze_texts(texts, ner_texts) + ([None] * len(texts),)
+    except Exception:
+        pass
+    # Reintento documento por documento para aislar el que falla
+    rows, errors = [], []
+    for j, text in enumerate(texts):
+        try:
+            rows.append(analyze_texts([text], None if ner_texts is None else [ner_texts[j]]))
+            errors.append(None)
+        except Exception as e:
+            rows.append(None)
+            errors.append(f"{type(e).__name__}: {e}")
+    dim = next((row[1].shape[1] for row in rows if row is not None), 0)
+    empty = (np.zeros(1, dtype=np.float32), np.zeros((1, dim), dtype=np.float32), np.zeros(1, dtype=np.float32),
+             np.zeros(1, dtype=np.float32), [[]])
+    rows = [row if row is not None else empty for row in rows]
+    polarity, embeddings, dispersion, readability = (np.concatenate([row[i] for row in rows]) for i in range(4))
+    return indices, polarity, embeddings, dispersion, readability, [row[4][0] for row in rows], errors
+
+
+def batches(texts, batch_size, ner_texts=None):
+    # Documentos de longitud parecida juntos: menos padding por lote
+    order = np.argsort([len(t) for t in texts], kind="stable")[::-1]
+    for i in range(0, len(order), batch_size):
+        idx = order[i:i + batch_size]
+        yield idx, [texts[k] for k in idx], None if ner_texts is None else [ner_texts[k] for k in idx]
+
+
+def analyze_corpus(texts, config, workers=None, batch_size=8, start_method=START_METHOD, ner_texts=None):
+    workers = workers or os.cpu_count() or 1
+    threads = threads_per_worker(workers)
+    n = len(texts)
+    polarity = np.zeros(n, dtype=np.float32)
+    readability = np.zeros(n, dtype=np.float32)
+    subjectivity = np.zeros(n, dtype=np.float32)
+    embeddings = None
+    people = [None] * n
+    errors = [None] * n
+
+    context = mp.get_context(start_method)
+    with context.Pool(workers, initializer=init_worker, initargs=(config, threads)) as pool:
+        for idx, pol, emb, subj, read, found, failed in pool.imap_unordered(analyze_batch,
+                                                                            batches(texts, batch_size, ner_texts)):
+            if emb.shape[1]:  # un lote donde fallaron todos no trae la dimensión
+                if embeddings is None:
+                    embeddings = np.zeros((n, emb.shape[1]), dtype=np.float32)
+                embeddings[idx] = emb
+            polarity[idx] = pol
+            readability[idx] = read
+            subjectivity[idx] = subj
+            for k, names, error in zip(idx, found, failed):
+                people[k] = names
+                errors[k] = error
+
+    return {"polarity": polarity, "subjectivity": subjectivity, "readability": readability,
+            "embeddings": embeddings, "people": people, "errors": errors}
@@ -0,0 +1,154 @@
+import glob
+import os
+import pickle
+import re
+import sys
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# === CONFIGURACIÓN ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERN = "theory*_sentiment_*.csv"
+RUNS_DIR = "runs"  # Corridas de runstore.py
+CACHE_FILE = ".report_cache.pkl"
+METRICS = ["Polarity", "Subjectivity", "Readability"]
+
+SELECTED_THEORIES = [
+    "Relativistic quantum mechanics",
+    "Big Bang",
+    "Chaos theory",
+    "Classical electromagnetism",
+    "Quantum chromodynamics",
+    "Quantum electrodynamics",
+    "Quantum mechanics",
+    "Standard Model",
+    "Theory of relativity",
+    "string theory"
+]
+
+
+def run_name(path):
+    # "theory3_sentiment_metrics.csv" -> "theory3_sentiment_metrics"
+    # "runs/<id>/theory_sentiment_embeddings.csv" -> "theory_sentiment_embeddings@<id>"
+    name = os.path.splitext(os.path.basename(path))[0]
+    parent = os.path.dirname(path)
+    if os.path.basename(os.path.dirname(parent)) == RUNS_DIR:
+        name += "@" + os.path.basename(parent)
+    return name
+
+
+def run_order(name):
+    # theory_ (sin número) primero, luego theory2 ... theory8
+    match = re.match(r'theory(\d*)_sentiment_(\w+)', name)
+    number = int(match.group(1)) if match and match.group(1) else 1
+    return (number, name)
+
+
+# === CARGA EN FORMATO LARGO ===
+# Todas las corridas quedan en un solo DataFrame (Run, Theory, Metric, Value,
+# Normalized). La normalización a [-1, 1] se calcula una vez por corrida y
+# métrica sobre la corrida completa, igual que fi2.py.
+def normalize(values, groups):
+    grouped = values.groupby(groups)
+    min_val = grouped.transform("min")
+    max_val = grouped.transform("max")
+    return 2 * (values - min_val) / (max_val - min_val) - 1  # Escala [0,1] → [-1,1]
+
+
+def read_runs(paths):
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        long = df.melt(id_vars="Theory", value_vars=METRICS, var_name="Metric", value_name="Value")
+        long.insert(0, "Run", run_name(path))
+        frames.append(long)
+    long = pd.concat(frames, ignore_index=True)
+    long["Run"] = pd.Categorical(long["Run"], categories=sorted(long["Run"].unique(), key=run_order))
+    long["Metric"] = pd.Categorical(long["Metric"], categories=METRICS)
+    long["Normalized"] = normalize(long["Value"], [long["Run"], long["Metric"]])
+    return long
+
+
+def run_paths(base_dir=BASE_DIR):
+    paths = glob.glob(os.path.join(base_dir, PATTERN))
+    paths += glob.glob(os.path.join(base_dir, RUNS_DIR, "*", PATTERN))
+    return sorted(paths)
+
+
+def run_signature(paths):
+    return [(run_name(p), os.path.getmtime(p)) for p in paths]
+
+
+# La caché se invalida si cambia el conjunto de archivos o alguna mtime
+def load_runs(base_dir=BASE_DIR, use_cache=True):
+    paths = run_paths(base_dir)
+    signature = run_signature(paths)
+    cache = os.path.join(base_dir, CACHE_FILE)
+
+    if use_cache and os.path.exists(cache):
+        with open(cache, "rb") as f:
+            cached = pickle.load(f)
+        if cached["signature"] == signature:
+            return cached["long"]
+
+    long = read_runs(paths)
+    if use_cache:
+        with open(cache, "wb") as f:
+            pickle.dump({"signature": signature, "long": long}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return long
+
+
+# === SELECCIÓN ===
+# scope="run": normalizado sobre toda la corrida (fi2.py)
+# scope="subset": normalizado solo entre las teorías elegidas (figure.py)
+def select(long, run, theories, scope="run"):
+    rows = long[(long["Run"] == run) & long["Theory"].isin(theories)]
+    values = rows["Normalized"] if scope == "run" else normalize(rows["Value"], rows["Metric"])
+    table = rows.assign(Normalized=values).pivot(index="Theory", columns="Metric", values="Normalized")
+    return table.reindex(columns=METRICS)
+
+
+# === GRÁFICAS ===
+def plot_grouped_bars(table, title="Normalized Sentiment Metrics per Theory", colors=None, ax=None):
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(14, 6))
+    x = np.arange(len(table))
+    width = 0.25
+    colors = colors or [None] * len(METRICS)
+
+    for i, (metric, color) in enumerate(zip(METRICS, colors)):
+        ax.bar(x + i * width, table[metric], width, label=metric, color=color)
+
+    ax.set_xticks(x + width)
+    ax.set_xticklabels(table.index, rotation=45, ha='right')
+    ax.set_ylabel("Normalized Value [-1, 1]")
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(axis='y')
+    ax.figure.tight_layout()
+    return ax.figure
+
+
+def render_all(long, theories, out_dir, scope="run", fmt="png"):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for run in long["Run"].cat.categories:
+        table = select(long, run, theories, scope)
+        if table.empty:
+            continue
+        fig = plot_grouped_bars(table, title=f"{run} ({scope})")
+        path = os.path.join(out_dir, f"{run}_{scope}.{fmt}")
+        fig.savefig(path, dpi=150)
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    plt.switch_backend("Agg")  # generación por lotes sin ventanas
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, "figures")
+    long = load_runs()
+    for scope in ("run", "subset"):
+        for path in render_all(long, SELECTED_THEORIES, out_dir, scope):
+            print(path)
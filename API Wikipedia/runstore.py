@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import time
+
+# === ALMACÉN DE CORRIDAS ===
+# Cada corrida vive en runs/<hash de la configuración>/ con un manifest.json que
+# guarda la configuración (modelos, truncados, secciones excluidas), las
+# revisiones de las páginas leídas y el sha256 de cada archivo de salida.
+# Una configuración idéntica reutiliza la corrida completa en lugar de recalcular,
+# y dos configuraciones distintas nunca escriben en el mismo directorio.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_DIR = os.path.join(BASE_DIR, "runs")
+MANIFEST = "manifest.json"
+
+
+def config_hash(config):
+    canonical = json.dumps(config, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(run):
+    path = os.path.join(run["dir"], MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(run["manifest"], f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def open_run(config, runs_dir=RUNS_DIR):
+    run_id = config_hash(config)
+    run_dir = os.path.join(runs_dir, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+
+    manifest_path = os.path.join(run_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    else:
+        manifest = {"id": run_id, "config": config, "status": "running", "started": time.time(),
+                    "revisions": {}, "outputs": {}}
+    run = {"id": run_id, "dir": run_dir, "manifest": manifest}
+    write_manifest(run)
+    return run
+
+
+def is_complete(run):
+    manifest = run["manifest"]
+    if manifest["status"] != "complete" or manifest.get("pending"):
+        return False
+    # Una salida borrada o modificada a mano invalida la reutilización
+    for name, digest in manifest["outputs"].items():
+        path = output_path(run, name)
+        if not os.path.exists(path) or file_hash(path) != digest:
+            return False
+    return True
+
+
+def output_path(run, name):
+    return os.path.join(run["dir"], name)
+
+
+def record_revision(run, title, revid):
+    # Se escribe de inmediato para que una corrida reanudada conserve las revisiones
+    run["manifest"]["revisions"][title] = revid
+    write_manifest(run)
+
+
+def record_cleaning(run, title, tokens, saved):
+    # Tokens aproximados que llegan a los modelos y los quitados por la limpieza del DOM
+    run["manifest"].setdefault("cleaning", {})[title] = {"tokens": tokens, "saved": saved}
+    write_manifest(run)
+
+
+def finish(run, names, pending=()):
+    # Con teorías pendientes (fallidas o sin procesar) la corrida queda "partial"
+    # y la próxima ejecución la reanuda desde el checkpoint en vez de reutilizarla
+    manifest = run["manifest"]
+    manifest["outputs"] = {name: file_hash(output_path(run, name)) for name in names}
+    manifest["pending"] = sorted(pending)
+    manifest["status"] = "partial" if pending else "complete"
+    manifest["finished"] = time.time()
+    write_manifest(run)
+
+
+def list_runs(runs_dir=RUNS_DIR):
+    runs = []
+    if not os.path.isdir(runs_dir):
+        return runs
+    for run_id in sorted(os.listdir(runs_dir)):
+        path = os.path.join(runs_dir, run_id, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                runs.append(json.load(f))
+    return runs
+
+
+if __name__ == "__main__":
+    for manifest in list_runs():
+        config = manifest["config"]
+        print(f"{manifest['id']}  {manifest['status']:<9} {config.get('script', '?'):<12} "
+              f"{len(manifest['revisions'])} páginas  {', '.join(manifest['outputs'])}")
+        if manifest.get("cleaning"):
+            saved = sum(page["saved"] for page in manifest["cleaning"].values())
+            tokens = sum(page["tokens"] for page in manifest["cleaning"].values())
+            print(f"{'':18}limpieza DOM: {saved} tokens quitados, {tokens} enviados a los modelos")
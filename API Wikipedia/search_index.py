@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import math
+import os
+import re
+import time
+from array import array
+import numpy as np
+
+from gazetteer import fold
+
+# === ÍNDICE INVERTIDO SOBRE EL CORPUS DE TEORÍAS ===
+# Búsqueda de texto completo sobre el texto limpio de cada artículo (el mismo
+# que llega a analyze_text), sin volver a correr los scripts.
+#   - Postings por término: ids de documento codificados en deltas
+#     (array "I") y frecuencias (array "H"); se decodifican con np.cumsum.
+#   - Ranking BM25 (k1, b); df y longitud media solo cuentan documentos vivos.
+#   - Alta/actualización incremental: un documento cambiado (otro sha1 del
+#     texto) se marca como borrado y se agrega con un id nuevo al final, así
+#     las deltas siguen siendo positivas. compact() renumera y descarta los
+#     borrados cuando pasan de COMPACT_RATIO.
+#   - Se guarda en un .npz con todos los postings concatenados.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(BASE_DIR, "theory_index.npz")
+K1 = 1.2
+B = 0.75
+COMPACT_RATIO = 0.25
+MAX_TF = 65535
+STOPWORDS = set("""a an and are as at be by for from has have in is it its of on or that the their this to was
+were which with""".split())
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    # Minúsculas sin acentos, como el gazetteer; el texto ASCII evita el plegado por carácter
+    text = text.lower() if text.isascii() else fold(text)
+    return [w for w in _WORD.findall(text) if w not in STOPWORDS]
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# === ÍNDICE EN MEMORIA ===
+def new_index():
+    return {
+        "postings": {},   # término -> [deltas, frecuencias, último id]
+        "titles": [],
+        "lengths": array("I"),
+        "alive": bytearray(),
+        "hashes": [],
+        "by_title": {},   # título -> id vivo
+    }
+
+
+def add_document(index, title, text):
+    # Devuelve "added", "updated" o "unchanged"
+    digest = text_hash(text)
+    old = index["by_title"].get(title)
+    if old is not None and index["hashes"][old] == digest:
+        return "unchanged"
+    if old is not None:
+        index["alive"][old] = 0
+
+    doc = len(index["titles"])
+    terms = tokenize(text)
+    counts = {}
+    for term in terms:
+        counts[term] = counts.get(term, 0) + 1
+    postings = index["postings"]
+    for term, tf in counts.items():
+        entry = postings.get(term)
+        if entry is None:
+            entry = postings[term] = [array("I"), array("H"), 0]
+            entry[0].append(doc)
+        else:
+            entry[0].append(doc - entry[2])
+        entry[1].append(min(tf, MAX_TF))
+        entry[2] = doc
+
+    index["titles"].append(title)
+    index["lengths"].append(len(terms))
+    index["alive"].append(1)
+    index["hashes"].append(digest)
+    index["by_title"][title] = doc
+    return "updated" if old is not None else "added"
+
+
+def remove_document(index, title):
+    doc = index["by_title"].pop(title, None)
+    if doc is not None:
+        index["alive"][doc] = 0
+    return doc is not None
+
+
+def add_corpus(index, corpus):
+    # corpus: {título: texto}; compacta al final si hay demasiados borrados
+    status = {"added": 0, "updated": 0, "unchanged": 0}
+    for title, text in corpus.items():
+        status[add_document(index, title, text)] += 1
+    maybe_compact(index)
+    return status
+
+
+def maybe_compact(index, ratio=COMPACT_RATIO):
+    # Para quien agrega con add_document: llamar antes de save_index
+    if deleted_ratio(index) > ratio:
+        compact(index)
+        return True
+    return False
+
+
+def deleted_ratio(index):
+    n = len(index["titles"])
+    return 1 - sum(index["alive"]) / n if n else 0.0
+
+
+def decode(entry):
+    return np.cumsum(np.frombuffer(entry[0], dtype=np.uint32), dtype=np.int64), np.frombuffer(entry[1], dtype=np.uint16)
+
+
+def compact(index):
+    # Renumera los documentos vivos y vuelve a codificar los postings sin los borrados
+    alive = np.frombuffer(bytes(index["alive"]), dtype=np.uint8).astype(bool)
+    remap = np.cumsum(alive) - 1
+    for term in list(index["postings"]):
+        ids, tfs = decode(index["postings"][term])
+        keep = alive[ids]
+        if not keep.any():
+            del index["postings"][term]
+            continue
+        ids = remap[ids[keep]]
+        index["postings"][term] = [array("I", np.diff(ids, prepend=0).astype(np.uint32).tobytes()),
+                                   array("H", tfs[keep].tobytes()), int(ids[-1])]
+    keep = np.flatnonzero(alive)
+    index["titles"] = [index["titles"][k] for k in keep]
+    index["hashes"] = [index["hashes"][k] for k in keep]
+    index["lengths"] = array("I", np.frombuffer(index["lengths"], dtype=np.uint32)[keep].tobytes())
+    index["alive"] = bytearray(b"\x01" * len(keep))
+    index["by_title"] = {title: k for k, title in enumerate(index["titles"])}
+
+
+# === BÚSQUEDA (BM25) ===
+def search(index, query, k=10, require_all=False):
+    # [(título, puntaje)] de mayor a menor; require_all: solo documentos con todos los términos
+    n = len(index["titles"])
+    if not n:
+        return []
+    alive = np.frombuffer(index["alive"], dtype=np.uint8).astype(bool)
+    lengths = np.frombuffer(index["lengths"], dtype=np.uint32)
+    n_alive = int(alive.sum())
+    avgdl = float(lengths[alive].mean()) if n_alive else 1.0
+    norm = K1 * (1 - B + B * lengths / avgdl)
+
+    terms = dict.fromkeys(tokenize(query))
+    if not terms:  # solo stopwords o puntuación
+        return []
+    scores = np.zeros(n)
+    hits = np.zeros(n, dtype=np.int32)
+    for term in terms:
+        entry = index["postings"].get(term)
+        if entry is None:
+            if require_all:
+                return []
+            continue
+        ids, tfs = decode(entry)
+        live = alive[ids]
+        ids, tfs = ids[live], tfs[live]
+        df = len(ids)
+        idf = math.log(1 + (n_alive - df + 0.5) / (df + 0.5))
+        scores[ids] += idf * tfs * (K1 + 1) / (tfs + norm[ids])
+        hits[ids] += 1
+
+    matched = (hits == len(terms) if require_all else hits > 0) & alive
+    candidates = np.flatnonzero(matched)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(index["titles"][d], float(scores[d])) for d in candidates]
+
+
+# === PERSISTENCIA ===
+def save_index(index, path=INDEX_FILE):
+    terms = sorted(index["postings"])
+    entries = [index["postings"][t] for t in terms]
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(e[0]) for e in entries], out=offsets[1:])
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(
+        tmp,
+        terms=np.array(terms, dtype=str),
+        offsets=offsets,
+        deltas=np.frombuffer(b"".join(e[0].tobytes() for e in entries), dtype=np.uint32),
+        tfs=np.frombuffer(b"".join(e[1].tobytes() for e in entries), dtype=np.uint16),
+        titles=np.array(index["titles"], dtype=str),
+        hashes=np.array(index["hashes"], dtype=str),
+        lengths=np.frombuffer(index["lengths"], dtype=np.uint32),
+        alive=np.frombuffer(bytes(index["alive"]), dtype=np.uint8),
+    )
+    os.replace(tmp, path)
+
+
+def load_index(path=INDEX_FILE):
+    if not os.path.exists(path):
+        return new_index()
+    data = np.load(path)
+    offsets, deltas, tfs = data["offsets"], data["deltas"], data["tfs"]
+    postings = {}
+    for i, term in enumerate(data["terms"].tolist()):
+        lo, hi = offsets[i], offsets[i + 1]
+        term_deltas = array("I", deltas[lo:hi].tobytes())
+        postings[term] = [term_deltas, array("H", tfs[lo:hi].tobytes()), int(sum(term_deltas))]
+    index = {
+        "postings": postings,
+        "titles": data["titles"].tolist(),
+        "lengths": array("I", data["lengths"].tobytes()),
+        "alive": bytearray(data["alive"].tobytes()),
+        "hashes": data["hashes"].tolist(),
+    }
+    index["by_title"] = {t: k for k, t in enumerate(index["titles"]) if index["alive"][k]}
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de búsqueda BM25 sobre el texto de las teorías")
+    parser.add_argument("--index", default=INDEX_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="agregar o actualizar páginas en el índice")
+    add.add_argument("--jsonl", help="páginas de dump_ingest.py (JSONL)")
+    add.add_argument("--fetch", action="store_true", help="descargar las teorías de 'Theoretical physics' con la API")
+    query = sub.add_parser("query", help="buscar")
+    query.add_argument("terms", nargs="+")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--all", action="store_true", help="exigir todos los términos")
+    sub.add_parser("stats", help="tamaño del índice")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = load_index(args.index)
+    loaded = time.perf_counter() - start
+
+    if args.command == "add":
+        corpus = {}
+        if args.jsonl:
+            from dump_ingest import load_corpus
+            corpus.update(load_corpus(args.jsonl))
+        if args.fetch:
+            from wikiapi import extract_all_sections, get_theory_titles
+            for label in sorted(get_theory_titles("Theoretical physics", ["Mainstream theories", "Proposed theories",
+                                                                         "Fringe theories"])):
+                try:
+                    corpus[label] = extract_all_sections(label)
+                except Exception as e:
+                    print(f"[Error {label}] {e}")
+        start = time.perf_counter()
+        status = add_corpus(index, corpus)
+        save_index(index, args.index)
+        print(f"{status['added']} nuevas, {status['updated']} actualizadas, {status['unchanged']} sin cambios "
+              f"({time.perf_counter() - start:.2f} s) -> {args.index}")
+    elif args.command == "query":
+        start = time.perf_counter()
+        results = search(index, " ".join(args.terms), args.k, args.all)
+        elapsed = time.perf_counter() - start
+        for title, score in results:
+            print(f"{score:8.3f}  {title}")
+        print(f"{len(results)} resultados en {1000 * elapsed:.3f} ms (índice cargado en {1000 * loaded:.0f} ms)")
+    else:
+        n_postings = sum(len(e[0]) for e in index["postings"].values())
+        print(f"{sum(index['alive'])} documentos vivos de {len(index['titles'])}, "
+              f"{len(index['postings'])} términos, {n_postings} postings")
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import sqlite3
+import numpy as np
+
+# === EMBEDDINGS POR ORACIÓN ===
+# embedder.encode(texto_completo) trunca en 256 tokens, por eso la
+# "Subjectivity" (std del vector) sale ~0.051 en todas las teorías. Aquí cada
+# artículo se parte en oraciones, todas se codifican en lotes grandes y por
+# documento se calculan el centroide y métricas de dispersión.
+# Los vectores se guardan por hash de oración en SQLite: si un artículo cambia
+# poco, solo se codifican las oraciones nuevas. La clave incluye el backend y la
+# cuantización (models.model_key) para no mezclar vectores torch y ONNX int8.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB = os.path.join(BASE_DIR, "sentence_cache.sqlite")
+BATCH_SIZE = 256
+MIN_CHARS = 20
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"(\[])')
+
+
+def split_sentences(text, min_chars=MIN_CHARS):
+    sentences = [s.strip() for s in _SENTENCE_END.split(text)]
+    return [s for s in sentences if len(s) >= min_chars]
+
+
+def sentence_key(model_key, sentence):
+    return hashlib.sha1(f"{model_key}\x00{sentence}".encode("utf-8")).digest()
+
+
+# === CACHÉ ===
+def open_cache(path=CACHE_DB):
+    db = sqlite3.connect(path, timeout=60)  # varios workers pueden compartir la caché
+    db.execute("CREATE TABLE IF NOT EXISTS vectors (key BLOB PRIMARY KEY, vector BLOB)")
+    return db
+
+
+def lookup(db, keys):
+    found = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows = db.execute(f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+        found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+    return found
+
+
+def store(db, keys, vectors):
+    db.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?)",
+                   ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in zip(keys, vectors)))
+    db.commit()
+
+
+# === CODIFICACIÓN ===
+def encode_sentences(sentences, embedder, model_key, db=None, batch_size=BATCH_SIZE):
+    keys = [sentence_key(model_key, s) for s in sentences]
+    cached = lookup(db, list(set(keys))) if db is not None else {}
+
+    missing = {}
+    for key, sentence in zip(keys, sentences):
+        if key not in cached and key not in missing:
+            missing[key] = sentence
+    if missing:
+        vectors = embedder.encode(list(missing.values()), batch_size=batch_size)
+        new = dict(zip(missing, np.asarray(vectors, dtype=np.float32)))
+        if db is not None:
+            store(db, list(new), list(new.values()))
+        cached.update(new)
+    return np.stack([cached[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32), len(missing)
+
+
+# === MÉTRICAS POR DOCUMENTO ===
+def document_stats(vectors):
+    if len(vectors) == 0:
+        return {"sentences": 0, "centroid": None, "dispersion": 0.0, "mean_pairwise_cosine": 0.0, "std": 0.0}
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    centroid = normed.mean(axis=0)
+    # Dispersión: 1 - similitud coseno media de cada oración con el centroide
+    centroid_unit = centroid / (np.linalg.norm(centroid) or 1.0)
+    dispersion = float(1.0 - (normed @ centroid_unit).mean())
+    # Coseno medio entre pares sin la diagonal, con ||sum||^2 = n + sum_{i!=j} cos
+    n = len(normed)
+    pairwise = float((np.square(normed.sum(axis=0)).sum() - n) / (n * (n - 1))) if n > 1 else 1.0
+    return {
+        "sentences": n,
+        "centroid": centroid,
+        "dispersion": dispersion,
+        "mean_pairwise_cosine": pairwise,
+        "std": float(normed.std(axis=0).mean()),
+    }
+
+
+def embed_documents(texts, embedder, model_key, cache_path=CACHE_DB, batch_size=BATCH_SIZE):
+    # Todas las oraciones de todos los documentos en una sola pasada por lotes
+    split = [split_sentences(text) for text in texts]
+    flat = [s for sentences in split for s in sentences]
+    db = open_cache(cache_path) if cache_path else None
+    try:
+        vectors, encoded = encode_sentences(flat, embedder, model_key, db, batch_size)
+    finally:
+        if db is not None:
+            db.close()
+
+    stats, start = [], 0
+    for sentences in split:
+        stats.append(document_stats(vectors[start:start + len(sentences)]))
+        start += len(sentences)
+    return stats, {"sentences": len(flat), "encoded": encoded}
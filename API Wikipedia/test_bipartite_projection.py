@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from bipartite_projection import project
+
+
+def brute_force(B, weighting):
+    # Todos los pares i < j con al menos un intermediario, sobre matrices densas
+    B = np.asarray(B, dtype=float)
+    common = B @ B.T
+    degree, k = B.sum(axis=1), B.sum(axis=0)
+    inverse = np.divide(1.0, k - 1, out=np.zeros(len(k)), where=k > 1)
+    edges = {}
+    for i in range(len(B)):
+        for j in range(i + 1, len(B)):
+            if common[i, j] < 1:
+                continue
+            if weighting == "count":
+                weight = common[i, j]
+            elif weighting == "jaccard":
+                weight = common[i, j] / (degree[i] + degree[j] - common[i, j])
+            else:
+                weight = (B[i] * B[j] * inverse).sum()
+            edges[(i, j)] = (weight, int(common[i, j]))
+    return edges
+
+
+def as_dict(edges):
+    source, target, weight, shared = edges
+    return {(int(s), int(t)): (float(w), int(c)) for s, t, w, c in zip(source, target, weight, shared)}
+
+
+@pytest.mark.parametrize("weighting", ["count", "jaccard", "newman"])
+@pytest.mark.parametrize("budget", [1, 3, 1_000])
+def test_projection_matches_dense_product(weighting, budget):
+    rng = np.random.default_rng(7)
+    B = (rng.random((30, 12)) < 0.15).astype(float)
+    B[:4] = 0
+    B[:4, 11] = [1, 0, 1, 0]  # filas con autores propios: bloques sin pares
+    got = as_dict(project(sp.csr_matrix(B), weighting, budget=budget))
+    expected = brute_force(B, weighting)
+    assert got.keys() == expected.keys()
+    for pair, (weight, shared) in expected.items():
+        assert got[pair][0] == pytest.approx(weight)
+        assert got[pair][1] == shared
+
+
+def test_newman_block_without_pairs():
+    edges = as_dict(project(sp.csr_matrix([[0, 0, 1], [1, 0, 0], [1, 1, 0]]), "newman", budget=1))
+    assert edges == {(1, 2): (1.0, 1)}
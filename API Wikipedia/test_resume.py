@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from checkpoint import (CHECKPOINT_FILE, load_checkpoint, completed_titles, mark_done, append_checkpoint,
+                        process_titles)
+from runstore import open_run, is_complete, output_path, finish
+
+CONFIG = {"script": "test_resume"}
+TITLES = {"Loop quantum gravity", "String theory", "Twistor theory"}
+
+
+def run_pipeline(runs_dir, fetch):
+    # Mismo esqueleto que try6/auth2 alrededor del bucle compartido process_titles
+    run = open_run(CONFIG, runs_dir)
+    if is_complete(run):
+        return run
+    checkpoint_path = output_path(run, CHECKPOINT_FILE)
+    results, edges, pending = process_titles(
+        checkpoint_path, TITLES, lambda title: ({"Theory": title, "Length": len(fetch(title))}, [(title, "A")]))
+    with open(output_path(run, "out.json"), "w", encoding="utf-8") as f:
+        json.dump({"results": results, "edges": edges}, f)
+    finish(run, ["out.json"], pending)
+    return run
+
+
+def test_failed_title_is_fetched_again_on_rerun(tmp_path):
+    fetched, failures = [], ["String theory"]
+
+    def flaky(title):
+        fetched.append(title)
+        if title in failures:
+            failures.remove(title)  # falla solo la primera vez
+            raise RuntimeError("timeout")
+        return title
+
+    run = run_pipeline(tmp_path, flaky)
+    assert run["manifest"]["status"] == "partial"
+    assert run["manifest"]["pending"] == ["String theory"]
+
+    fetched.clear()
+    run = run_pipeline(tmp_path, flaky)
+    assert fetched == ["String theory"]
+    assert run["manifest"]["status"] == "complete"
+
+    fetched.clear()
+    run_pipeline(tmp_path, flaky)
+    assert fetched == []
+
+
+def test_append_after_torn_line_keeps_new_record(tmp_path):
+    path = tmp_path / CHECKPOINT_FILE
+    mark_done(path, "String theory", {}, [])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"title": "Twistor th')  # caída a mitad de la escritura
+    append_checkpoint(path, {"title": "Twistor theory", "status": "ok", "result": {}, "edges": []})
+    assert completed_titles(load_checkpoint(path)) == {"String theory", "Twistor theory"}
+
+
+def test_process_titles_marks_done_only_with_a_result(tmp_path):
+    path = tmp_path / CHECKPOINT_FILE
+
+    def process(title):
+        if title == "String theory":
+            raise RuntimeError("sin texto")
+        return {"Theory": title}, [(title, "A")]
+
+    results, edges, pending = process_titles(path, TITLES, process)
+    records = load_checkpoint(path)
+    assert records["String theory"]["status"] == "error"
+    assert pending == {"String theory"}
+    assert [r["Theory"] for r in results] == ["Loop quantum gravity", "Twistor theory"]
+    assert edges == [("Loop quantum gravity", "A"), ("Twistor theory", "A")]
+
+    calls = []
+    results, edges, pending = process_titles(path, TITLES, lambda title: calls.append(title) or ({"Theory": title}, []))
+    assert calls == ["String theory"]
+    assert pending == set()
+
+
+def test_process_titles_does_not_swallow_interrupts(tmp_path):
+    path = tmp_path / CHECKPOINT_FILE
+
+    def process(title):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        process_titles(path, TITLES, process)
+    assert load_checkpoint(path) == {}
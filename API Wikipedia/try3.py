@@ -2,19 +2,41 @@ import requests
 from bs4 import BeautifulSoup
 import csv
 import re
+import sys
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from transformers import pipeline
+from runstore import open_run, is_complete, output_path, record_revision, finish
 
 API_URL = "https://en.wikipedia.org/w/api.php"
 TITLE = "Theoretical physics"
 TARGET_SECTIONS = ["Mainstream theories", "Proposed theories", "Fringe theories"]
 EXCLUDED_SECTIONS = {"See also", "References", "Further reading", "External links", "Bibliography", "Notes"}
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+NER_MODEL = "dslim/bert-base-NER"
+
+# === CORRIDA (runs/<hash>/) ===
+RUN_CONFIG = {
+    "script": "try3",
+    "title": TITLE,
+    "target_sections": TARGET_SECTIONS,
+    "excluded_sections": sorted(EXCLUDED_SECTIONS),
+    "models": {"embedding": EMBEDDING_MODEL, "sentiment": SENTIMENT_MODEL, "ner": NER_MODEL},
+    "truncation": {"sentiment_chars": 512, "ner_chars": 1000},
+}
+METRICS_FILE = "theory4_sentiment_embeddings.csv"
+EDGES_FILE = "theory_author_bipartite.csv"
+
+run = open_run(RUN_CONFIG)
+if is_complete(run):
+    print(f"Corrida {run['id']} ya calculada con esta configuración: {run['dir']}")
+    sys.exit(0)
 
 # === MODELOS ===
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-ner_pipeline = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+embedder = SentenceTransformer(EMBEDDING_MODEL)
+sentiment_pipeline = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+ner_pipeline = pipeline("ner", model=NER_MODEL, aggregation_strategy="simple")
 
 # === FUNCIONES UTILITARIAS ===
 
@@ -81,10 +103,11 @@ def extract_links_from_html(html):
     return sorted(list(links))
 
 def extract_lead_section(title):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "redirects": True}
+    params = {"action": "parse", "format": "json", "page": title, "prop": "text|revid", "redirects": True}
     response = requests.get(API_URL, params=params).json()
     if "error" in response:
         raise Exception(response["error"]["info"])
+    record_revision(run, title, response["parse"].get("revid"))
     html = response["parse"]["text"]["*"]
     soup = BeautifulSoup(html, "html.parser")
     lead_paragraphs = []
@@ -160,14 +183,21 @@ for label in sorted(all_labels):
 
 # === GUARDAR CSV ===
 
-with open("theory4_sentiment_embeddings.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, METRICS_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.DictWriter(f, fieldnames=["Theory", "Polarity", "Subjectivity", "Readability"])
     writer.writeheader()
     for row in all_results:
         writer.writerow(row)
 
-with open("theory_author_bipartite.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, EDGES_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.writer(f)
     writer.writerow(["Theory", "Author"])
     for theory, author in bipartite_edges:
         writer.writerow([theory, author])
+
+# Sin checkpoint: las teorías que fallaron dejan la corrida "partial" para que se recalcule
+pending = all_labels - {row["Theory"] for row in all_results}
+finish(run, [METRICS_FILE, EDGES_FILE], pending)
+print(f"\nCorrida {run['id']} guardada en {run['dir']}")
+if pending:
+    print(f"{len(pending)} teorías fallaron; volver a ejecutar para reintentarlas")
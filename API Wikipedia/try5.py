@@ -3,6 +3,7 @@ from bs4 import BeautifulSoup
 import csv
 import re
 import numpy as np
+from gazetteer import load_automaton, match_authors
 from sentence_transformers import SentenceTransformer
 from transformers import pipeline
 
@@ -16,6 +17,7 @@ EXCLUDED_SECTIONS = {"See also", "References", "Further reading", "External link
 embedder = SentenceTransformer("all-MiniLM-L6-v2")
 sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
 ner_pipeline = pipeline("ner", model="allenai/scibert_scivocab_uncased", aggregation_strategy="simple")
+automaton = load_automaton()  # gazetteer de físicos (Wikidata)
 
 # === UTILITIES ===
 
@@ -74,25 +76,16 @@ def extract_people_ner(text):
     entities = ner_pipeline(text[:1000])
     return {clean_author_name(ent['word']) for ent in entities if ent['entity_group'] == "PER"}
 
+# Los cinco disparadores en una sola expresión: una pasada sobre el texto
+TRIGGER_PATTERN = re.compile(r"(?:(?:proposed|developed|introduced|formulated) by|named after) ([A-Z][a-z]+(?: [A-Z][a-z]+)?)")
+
 def extract_people_regex(text):
-    patterns = [
-        r"proposed by ([A-Z][a-z]+(?: [A-Z][a-z]+)?)",
-        r"developed by ([A-Z][a-z]+(?: [A-Z][a-z]+)?)",
-        r"introduced by ([A-Z][a-z]+(?: [A-Z][a-z]+)?)",
-        r"formulated by ([A-Z][a-z]+(?: [A-Z][a-z]+)?)",
-        r"named after ([A-Z][a-z]+(?: [A-Z][a-z]+)?)",
-    ]
-    people = set()
-    for pat in patterns:
-        matches = re.findall(pat, text)
-        for m in matches:
-            people.add(clean_author_name(m))
-    return people
+    return {clean_author_name(m) for m in TRIGGER_PATTERN.findall(text)}
 
 def get_authors(text):
     ner_people = extract_people_ner(text)
     regex_people = extract_people_regex(text)
-    return {p for p in ner_people.union(regex_people) if p}
+    return {p for p in ner_people | regex_people | match_authors(text, automaton) if p}
 
 # === WIKIPEDIA FUNCTIONS ===
 
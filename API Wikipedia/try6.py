@@ -1,165 +1,205 @@
 # Este script mejora la detección de autores asociados a teorías científicas
 # usando NER extendido y consultas avanzadas a Wikidata para propiedades como P50, P61, etc.
 
-import requests
-from bs4 import BeautifulSoup
 import csv
-import re
+import os
+import sys
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline
+import instrument
+from models import (load_sentiment, load_ner, load_embedder, check_backend, model_key, SENTIMENT_MODEL,
+                    EMBEDDING_MODEL, NER_MODEL)
+from sentence_embeddings import embed_documents
+from wikiapi import (preprocess_text, calculate_readability, get_wikidata_id, get_authors_from_wikidata,
+                     extract_all_sections, get_theory_titles, BOILERPLATE_SELECTORS)
+from runstore import open_run, is_complete, output_path, record_revision, record_cleaning, finish, file_hash
+from gazetteer import GAZETTEER_FILE, optional_automaton, find_spans, find_people, ner_remainder
+from search_index import load_index, add_document, maybe_compact, save_index
+from checkpoint import CHECKPOINT_FILE, load_checkpoint, reset_checkpoint, completed_titles, process_titles
 
 # === CONFIGURACION ===
-API_URL = "https://en.wikipedia.org/w/api.php"
-WIKIDATA_API = "https://www.wikidata.org/w/api.php"
 TITLE = "Theoretical physics"
 TARGET_SECTIONS = ["Mainstream theories", "Proposed theories", "Fringe theories"]
 EXCLUDED_SECTIONS = {"See also", "References", "Further reading", "External links", "Bibliography", "Notes"}
+SENTIMENT_CHARS = 512
+NER_CHUNK = 800
+WIKIDATA_PROPS = ['P50', 'P61', 'P737']
+MODEL_BACKEND = check_backend(os.environ.get("MODEL_BACKEND", "torch"))  # "torch" u "onnx" (int8)
+# "document": un vector por artículo (trunca en 256 tokens); "sentence": centroide
+# de las oraciones y Subjectivity = dispersión media respecto al centroide
+EMBEDDING_MODE = os.environ.get("EMBEDDING_MODE", "document")
+# --workers N: analiza los textos en N procesos con una réplica de los modelos cada uno
+WORKERS = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 0
+# Gazetteer de físicos antes del NER: "remainder" pasa al NER solo las oraciones
+# que no resolvió, "merge" corre el NER sobre todo el texto, "off" solo NER
+GAZETTEER_MODE = os.environ.get("GAZETTEER_MODE", "remainder")
+automaton = optional_automaton(GAZETTEER_MODE)
+if automaton is None:
+    GAZETTEER_MODE = "off"  # la corrida queda registrada como lo que realmente hizo
+
+# === CORRIDA (runs/<hash>/) ===
+RUN_CONFIG = {
+    "script": "try6",
+    "title": TITLE,
+    "target_sections": TARGET_SECTIONS,
+    "excluded_sections": sorted(EXCLUDED_SECTIONS),
+    "models": {"embedding": EMBEDDING_MODEL, "sentiment": SENTIMENT_MODEL, "ner": NER_MODEL,
+               "backend": MODEL_BACKEND, "embedding_mode": EMBEDDING_MODE},
+    "truncation": {"sentiment_chars": SENTIMENT_CHARS, "ner_chunk": NER_CHUNK},
+    "dom_cleaning": BOILERPLATE_SELECTORS,
+    "wikidata_props": WIKIDATA_PROPS,
+    "gazetteer": {"mode": GAZETTEER_MODE, "sha256": file_hash(GAZETTEER_FILE) if automaton else None},
+}
+METRICS_FILE = "theory_sentiment_embeddings.csv"
+EDGES_FILE = "theory_author_bipartite.csv"
+
+run = open_run(RUN_CONFIG)
+if is_complete(run):
+    print(f"Corrida {run['id']} ya calculada con esta configuración: {run['dir']}")
+    sys.exit(0)
+
+# Por defecto se reanuda desde el checkpoint de la corrida; --fresh empieza de cero
+checkpoint_path = output_path(run, CHECKPOINT_FILE)
+if "--fresh" in sys.argv:
+    reset_checkpoint(checkpoint_path)
 
 # === MODELOS ===
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-ner_pipeline = pipeline("ner", model="allenai/scibert_scivocab_uncased", aggregation_strategy="simple")
-
-# === FUNCIONES DE LIMPIEZA ===
-def preprocess_text(text):
-    text = re.sub(r'\[\d+\]', '', text)
-    text = re.sub(r'\{\\displaystyle.*?\}', '', text)
-    text = re.sub(r'\\[a-zA-Z]+', '', text)
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
-    text = re.sub(r'\[\s*edit\s*\]', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'(Main article|See also|Further reading):.*', '', text)
-    return re.sub(r'\s+', ' ', text).strip()
-
-def html_to_text(html):
-    soup = BeautifulSoup(html, "html.parser")
-    for br in soup.find_all("br"):
-        br.replace_with("\n")
-    return re.sub(r'\s+', ' ', soup.get_text(" ", strip=True))
+# En modo --workers los modelos se cargan en cada proceso, no aquí
+if not WORKERS:
+    embedder = load_embedder(EMBEDDING_MODEL, MODEL_BACKEND)
+    sentiment_pipeline = load_sentiment(SENTIMENT_MODEL, MODEL_BACKEND)
+    ner_pipeline = load_ner(NER_MODEL, MODEL_BACKEND)
 
 # === METRICAS ===
+@instrument.timed("sentiment")
 def get_sentiment_score(text):
-    result = sentiment_pipeline(text[:512])[0]
+    instrument.count_tokens("sentiment", sentiment_pipeline.tokenizer, text[:SENTIMENT_CHARS])
+    result = sentiment_pipeline(text[:SENTIMENT_CHARS])[0]
     return result['score'] if result['label'] == 'POSITIVE' else -result['score']
 
+@instrument.timed("embedding")
 def get_embedding(text):
+    instrument.count_tokens("embedding", embedder.tokenizer, text)
     return embedder.encode(text)
 
-def calculate_readability(text):
-    sentence_count = text.count('.') or 1
-    word_count = len(text.split())
-    alpha_count = sum(map(str.isalpha, text))
-    return float(206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (alpha_count / word_count))
+@instrument.timed("embedding")
+def get_sentence_dispersion(text):
+    stats, _ = embed_documents([text], embedder, model_key(EMBEDDING_MODEL, MODEL_BACKEND))
+    return stats[0]["dispersion"]
 
 def analyze_text(text):
     text = preprocess_text(text)
     polarity = get_sentiment_score(text)
-    embedding = get_embedding(text)
-    subjectivity = float(np.std(embedding))
+    if EMBEDDING_MODE == "sentence":
+        subjectivity = get_sentence_dispersion(text)
+    else:
+        subjectivity = float(np.std(get_embedding(text)))
     readability = calculate_readability(text)
     return polarity, subjectivity, readability
 
 # === NER AVANZADO ===
+@instrument.timed("ner")
 def extract_people_ner(text):
     entities = []
-    chunk_size = 800
-    for i in range(0, len(text), chunk_size):
-        entities += ner_pipeline(text[i:i+chunk_size])
+    for i in range(0, len(text), NER_CHUNK):
+        instrument.count_tokens("ner", ner_pipeline.tokenizer, text[i:i+NER_CHUNK])
+        entities += ner_pipeline(text[i:i+NER_CHUNK])
     return {ent['word'].strip().title() for ent in entities if ent['entity_group'] == "PER" and len(ent['word']) > 2}
 
-# === WIKIDATA ===
-def get_wikidata_id(title):
-    params = {"action": "query", "format": "json", "titles": title, "prop": "pageprops"}
-    res = requests.get(API_URL, params=params).json()
-    page = next(iter(res['query']['pages'].values()))
-    return page['pageprops'].get('wikibase_item') if 'pageprops' in page else None
-
-def get_authors_from_wikidata(wikidata_id):
-    people = set()
-    props = ['P50', 'P61', 'P737']
-    for prop in props:
-        params = {"action": "wbgetclaims", "format": "json", "entity": wikidata_id, "property": prop}
-        res = requests.get(WIKIDATA_API, params=params).json()
-        if prop in res.get("claims", {}):
-            for claim in res["claims"][prop]:
-                if "mainsnak" in claim and "datavalue" in claim["mainsnak"]:
-                    qid = claim["mainsnak"]["datavalue"]["value"]["id"]
-                    name = get_label_from_qid(qid)
-                    if name:
-                        people.add(name)
-    return people
-
-def get_label_from_qid(qid):
-    params = {"action": "wbgetentities", "format": "json", "ids": qid, "props": "labels", "languages": "en"}
-    res = requests.get(WIKIDATA_API, params=params).json()
-    return res.get("entities", {}).get(qid, {}).get("labels", {}).get("en", {}).get("value")
-
-# === WIKIPEDIA ===
-def get_section_index(title):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "sections"}
-    return requests.get(API_URL, params=params).json()["parse"]["sections"]
-
-def get_section_text(title, index):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "section": index}
-    html = requests.get(API_URL, params=params).json()["parse"]["text"]["*"]
-    return html_to_text(html)
-
-def extract_lead_section(title):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "redirects": True}
-    html = requests.get(API_URL, params=params).json()["parse"]["text"]["*"]
-    soup = BeautifulSoup(html, "html.parser")
-    return " ".join(tag.get_text(" ", strip=True) for tag in soup.find_all("p"))
-
-def extract_all_sections(title):
-    text = extract_lead_section(title) + " "
-    for sec in get_section_index(title):
-        if sec['line'].strip() not in EXCLUDED_SECTIONS:
-            text += get_section_text(title, sec['index']) + " "
-    return preprocess_text(text)
-
-def get_section_html(title, index):
-    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "section": index}
-    return requests.get(API_URL, params=params).json()["parse"]["text"]["*"]
-
-def extract_links_from_html(html):
-    soup = BeautifulSoup(html, "html.parser")
-    return sorted({a.get_text(strip=True) for a in soup.find_all("a", href=True) if a['href'].startswith("/wiki/") and not a['href'].startswith("/wiki/Special:")})
+def extract_people(text):
+    if automaton is None:
+        return extract_people_ner(text)
+    return find_people(text, automaton, extract_people_ner, remainder_only=GAZETTEER_MODE == "remainder")
 
 # === PROCESAMIENTO PRINCIPAL ===
-section_indices = {s['line'].strip(): s['index'] for s in get_section_index(TITLE) if s['line'].strip() in TARGET_SECTIONS}
-all_labels = set()
-for section_name, index in section_indices.items():
-    html = get_section_html(TITLE, index)
-    all_labels.update(extract_links_from_html(html))
-
-results, edges, seen = [], [], set()
-
-for label in sorted(all_labels):
-    if label in seen: continue
-    seen.add(label)
+all_labels = get_theory_titles(TITLE, TARGET_SECTIONS)
+# Índice de búsqueda compartido entre corridas: cada texto descargado se agrega o actualiza
+search_idx = load_index()
+
+seen = completed_titles(load_checkpoint(checkpoint_path))
+# El índice se guarda al final: si la corrida anterior se cortó, las teorías ya
+# en el checkpoint pueden faltar en el índice y se vuelven a descargar solo para él
+for label in sorted(t for t in seen if t not in search_idx["by_title"]):
     try:
-        text = extract_all_sections(label)
+        add_document(search_idx, label, extract_all_sections(label, EXCLUDED_SECTIONS))
+    except Exception as e:
+        print(f"[Índice {label}] {e}")
+
+def on_clean(title, tokens, saved):
+    record_cleaning(run, title, tokens, saved)
+    print(f"[limpieza] {title}: {saved} tokens quitados (navbox/infobox/refs/math/tablas), quedan {tokens}")
+
+def add_wikidata_authors(label, authors):
+    wikidata_id = get_wikidata_id(label)
+    if wikidata_id:
+        authors.update(get_authors_from_wikidata(wikidata_id, WIKIDATA_PROPS))
+    return authors
+
+def fetch_text(label):
+    text = extract_all_sections(label, EXCLUDED_SECTIONS, lambda title, revid: record_revision(run, title, revid),
+                                on_clean)
+    add_document(search_idx, label, text)
+    return text
+
+if WORKERS:
+    # 1) Descarga (E/S, en serie)  2) Modelos en paralelo  3) Wikidata y checkpoint por teoría
+    from parallel_nlp import analyze_corpus
+    prepared = {}  # título -> (resultado, personas) o la excepción que lo hizo fallar
+    fetched, texts = [], []
+    for label in sorted(all_labels - seen):
+        try:
+            texts.append(preprocess_text(fetch_text(label)))
+            fetched.append(label)
+        except Exception as e:
+            prepared[label] = e
+
+    config = {"sentiment": SENTIMENT_MODEL, "embedding": EMBEDDING_MODEL, "ner": NER_MODEL,
+              "backend": MODEL_BACKEND, "sentiment_chars": SENTIMENT_CHARS, "ner_chunk": NER_CHUNK,
+              "embedding_mode": EMBEDDING_MODE}
+    # El gazetteer corre aquí; a los workers solo va el resto para el NER
+    spans = [find_spans(text, automaton) if automaton else [] for text in texts]
+    ner_texts = [ner_remainder(text, sp) for text, sp in zip(texts, spans)] if GAZETTEER_MODE == "remainder" else None
+    analysis = analyze_corpus(texts, config, workers=WORKERS, ner_texts=ner_texts) if texts else None
+    for k, label in enumerate(fetched):
+        if analysis["errors"][k]:
+            prepared[label] = RuntimeError(analysis["errors"][k])
+            continue
+        result = {"Theory": label, "Polarity": float(analysis["polarity"][k]),
+                  "Subjectivity": float(analysis["subjectivity"][k]),
+                  "Readability": float(analysis["readability"][k])}
+        prepared[label] = (result, {canonical for _, _, canonical in spans[k]} | set(analysis["people"][k]))
+
+    def process_theory(label):
+        if isinstance(prepared[label], Exception):
+            raise prepared[label]
+        result, found = prepared[label]
+        authors = add_wikidata_authors(label, found)
+        return result, [(label, author) for author in sorted(authors)]
+else:
+    def process_theory(label):
+        text = fetch_text(label)
         print(f"\n--- {label} ---\n{text[:300]}...")
         pol, subj, read = analyze_text(text)
-        results.append({"Theory": label, "Polarity": pol, "Subjectivity": subj, "Readability": read})
+        result = {"Theory": label, "Polarity": pol, "Subjectivity": subj, "Readability": read}
+        authors = add_wikidata_authors(label, extract_people(text))
+        return result, [(label, author) for author in sorted(authors)]
 
-        authors = extract_people_ner(text)
-        wikidata_id = get_wikidata_id(label)
-        if wikidata_id:
-            authors.update(get_authors_from_wikidata(wikidata_id))
-        for author in authors:
-            edges.append((label, author))
+results, edges, pending = process_titles(checkpoint_path, all_labels, process_theory)
+maybe_compact(search_idx)
+save_index(search_idx)
 
-    except Exception as e:
-        print(f"[Error {label}] {e}")
-
-with open("theory_sentiment_embeddings.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, METRICS_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.DictWriter(f, fieldnames=["Theory", "Polarity", "Subjectivity", "Readability"])
     writer.writeheader()
     writer.writerows(results)
 
-with open("theory_author_bipartite.csv", "w", newline='', encoding="utf-8") as f:
+with open(output_path(run, EDGES_FILE), "w", newline='', encoding="utf-8") as f:
     writer = csv.writer(f)
     writer.writerow(["Theory", "Author"])
     for row in edges:
         writer.writerow(row)
+
+finish(run, [METRICS_FILE, EDGES_FILE], pending)
+instrument.finish_trace(run["dir"])
+print(f"\nCorrida {run['id']} guardada en {run['dir']}")
+if pending:
+    print(f"{len(pending)} teorías pendientes (fallidas o sin procesar); volver a ejecutar para reintentarlas")
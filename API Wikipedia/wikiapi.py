@@ -0,0 +1,341 @@
+from bs4 import BeautifulSoup
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import zipfile
+from urllib.parse import unquote
+import requests
+
+import instrument
+
+# === CLIENTE HTTP COMPARTIDO ===
+# Una sola sesión reutiliza las conexiones a Wikipedia/Wikidata y es el único
+# punto por donde pasan las peticiones, así se cuentan requests y bytes.
+API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIDATA_API = "https://www.wikidata.org/w/api.php"
+EXCLUDED_SECTIONS = {"See also", "References", "Further reading", "External links", "Bibliography", "Notes"}
+WIKIDATA_PROPS = ['P50', 'P61', 'P737']
+BATCH_TITLES = 50  # máximo de títulos por petición de action=query
+# Wikimedia (y el endpoint SPARQL de Wikidata) bloquea el User-Agent genérico de requests
+USER_AGENT = os.environ.get("WIKI_USER_AGENT", "NarracionDatos-APIWikipedia/1.0 (theory/author research scripts)")
+
+session = requests.Session()
+session.headers["User-Agent"] = USER_AGENT
+
+
+# === TRANSPORTE ===
+# Un transporte recibe (url, params) y devuelve el cuerpo de la respuesta en
+# bytes. Por defecto es HTTP en vivo; el benchmark inyecta uno que graba o
+# reproduce las respuestas desde un archivo de fixtures.
+def http_transport(url, params):
+    return session.get(url, params=params).content
+
+
+transport = http_transport
+
+
+def set_transport(new_transport):
+    global transport
+    transport = new_transport or http_transport
+
+
+def request_key(url, params):
+    canonical = json.dumps([url, sorted((k, str(v)) for k, v in params.items())], ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest() + ".json"
+
+
+def recording_transport(archive_path, inner=http_transport):
+    archive = zipfile.ZipFile(archive_path, "a", compression=zipfile.ZIP_DEFLATED)
+    stored = set(archive.namelist())
+
+    def record(url, params):
+        body = inner(url, params)
+        key = request_key(url, params)
+        if key not in stored:
+            archive.writestr(key, body)
+            stored.add(key)
+        return body
+    record.archive = archive
+    return record
+
+
+def replay_transport(archive_path):
+    archive = zipfile.ZipFile(archive_path, "r")
+
+    def replay(url, params):
+        key = request_key(url, params)
+        try:
+            return archive.read(key)
+        except KeyError:
+            raise KeyError(f"Respuesta no grabada en {archive_path}: {url} {params}")
+    replay.archive = archive
+    return replay
+
+
+def get_json(url, params):
+    with instrument.stage("http"):
+        body = transport(url, params)
+    instrument.count("http.requests")
+    instrument.count("http.bytes", len(body))
+    return json.loads(body)
+
+
+# === FUNCIONES DE LIMPIEZA ===
+# Antes de extraer el texto se sacan del DOM los bloques que no son prosa:
+# navboxes, infoboxes y barras laterales, listas y marcas de referencias,
+# fórmulas (<math>, mwe-math) y tablas. Lo que se quita ya no pasa por
+# sentiment/NER/embedding, y preprocess_text no necesita borrar todo lo no
+# ASCII (eso partía nombres como "Schrödinger"): solo descarta símbolos.
+BOILERPLATE_SELECTORS = ", ".join([
+    "table", ".navbox", ".vertical-navbox", ".infobox", ".sidebar", ".metadata", ".ambox",
+    ".reflist", ".references", ".mw-references-wrap", "sup.reference", ".mw-cite-backlink",
+    "math", ".mwe-math-element", ".mw-editsection", ".hatnote", "style", "script",
+])
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+_PUNCT = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-", "\u00a0": " "})
+
+def approx_tokens(text):
+    # Aproximación de los tokens del modelo: palabras y signos sueltos
+    return len(_TOKEN.findall(text))
+
+def strip_boilerplate(root):
+    # Elimina los bloques de BOILERPLATE_SELECTORS bajo root y devuelve los tokens quitados
+    removed = 0
+    for tag in root.select(BOILERPLATE_SELECTORS):
+        if tag.decomposed:  # ya cayó con un bloque que lo contenía
+            continue
+        removed += approx_tokens(tag.get_text(" "))
+        tag.decompose()
+    instrument.count("tokens.saved", removed)
+    return removed
+
+def cut_at_first_heading(soup):
+    # Deja solo lo anterior al primer <h2>, así la limpieza del lead no cuenta lo de las secciones
+    heading = soup.find("h2")
+    if heading is None:
+        return soup
+    for tag in list(heading.find_all_next()):
+        if not tag.decomposed:
+            tag.decompose()
+    heading.decompose()
+    return soup
+
+def strip_displaystyle(text):
+    # {\displaystyle ...} con llaves anidadas: se descarta hasta cerrar la primera
+    parts, i = [], 0
+    while True:
+        j = text.find("{\\displaystyle", i)
+        if j < 0:
+            parts.append(text[i:])
+            return "".join(parts)
+        parts.append(text[i:j])
+        depth = 0
+        for k in range(j, len(text)):
+            depth += (text[k] == "{") - (text[k] == "}")
+            if depth == 0:
+                break
+        i = k + 1
+
+@instrument.timed("clean")
+def preprocess_text(text):
+    text = unicodedata.normalize("NFC", text).translate(_PUNCT)
+    text = re.sub(r'\[\d+\]', '', text)
+    text = strip_displaystyle(text)
+    text = re.sub(r'\\[a-zA-Z]+', '', text)
+    text = re.sub(r'[^\x00-\x7F\w]+', ' ', text)  # símbolos no ASCII; las letras acentuadas quedan
+    text = re.sub(r'\[\s*edit\s*\]', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'(Main article|See also|Further reading):.*', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def calculate_readability(text):
+    # Flesch aproximado (letras por palabra en vez de sílabas); lo usan try6.py y parallel_nlp.py
+    sentence_count = text.count('.') or 1
+    word_count = len(text.split()) or 1
+    alpha_count = sum(map(str.isalpha, text))
+    return float(206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (alpha_count / word_count))
+
+@instrument.timed("parse")
+def html_to_text(html, saved=None):
+    # saved: lista opcional donde se anotan los tokens quitados por strip_boilerplate
+    soup = BeautifulSoup(html, "html.parser")
+    removed = strip_boilerplate(soup)
+    if saved is not None:
+        saved.append(removed)
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    return re.sub(r'\s+', ' ', soup.get_text(" ", strip=True))
+
+@instrument.timed("parse")
+def lead_text_from_html(html, saved=None):
+    # Párrafos antes del primer encabezado, como get_lead_paragraphs en auth2. La
+    # limpieza va sobre todo el lead: así tampoco entran los <p> de una infobox
+    soup = cut_at_first_heading(BeautifulSoup(html, "html.parser"))
+    removed = strip_boilerplate(soup)
+    paragraphs = [tag.get_text(" ", strip=True) for tag in soup.find_all("p")]
+    if saved is not None:
+        saved.append(removed)
+    return " ".join(paragraphs)
+
+@instrument.timed("parse")
+def extract_links_from_html(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return sorted({a.get_text(strip=True) for a in soup.find_all("a", href=True) if a['href'].startswith("/wiki/") and not a['href'].startswith("/wiki/Special:")})
+
+@instrument.timed("parse")
+def extract_link_targets_from_html(html):
+    # {texto del enlace: título de la página enlazada}
+    soup = BeautifulSoup(html, "html.parser")
+    targets = {}
+    for a in soup.find_all("a", href=True):
+        href = a['href']
+        if href.startswith("/wiki/") and not href.startswith("/wiki/Special:"):
+            title = unquote(href[len("/wiki/"):].split("#")[0]).replace("_", " ")
+            targets.setdefault(a.get_text(strip=True), title)
+    return targets
+
+# === WIKIDATA ===
+@instrument.timed("wikidata")
+def get_wikidata_id(title):
+    params = {"action": "query", "format": "json", "titles": title, "prop": "pageprops"}
+    res = get_json(API_URL, params)
+    page = next(iter(res['query']['pages'].values()))
+    return page['pageprops'].get('wikibase_item') if 'pageprops' in page else None
+
+@instrument.timed("wikidata")
+def get_authors_from_wikidata(wikidata_id, props=WIKIDATA_PROPS):
+    people = set()
+    for prop in props:
+        params = {"action": "wbgetclaims", "format": "json", "entity": wikidata_id, "property": prop}
+        res = get_json(WIKIDATA_API, params)
+        if prop in res.get("claims", {}):
+            for claim in res["claims"][prop]:
+                if "mainsnak" in claim and "datavalue" in claim["mainsnak"]:
+                    qid = claim["mainsnak"]["datavalue"]["value"]["id"]
+                    name = get_label_from_qid(qid)
+                    if name:
+                        people.add(name)
+    return people
+
+def get_label_from_qid(qid):
+    params = {"action": "wbgetentities", "format": "json", "ids": qid, "props": "labels", "languages": "en"}
+    res = get_json(WIKIDATA_API, params)
+    return res.get("entities", {}).get(qid, {}).get("labels", {}).get("en", {}).get("value")
+
+# === WIKIPEDIA ===
+def get_section_index(title):
+    params = {"action": "parse", "format": "json", "page": title, "prop": "sections"}
+    return get_json(API_URL, params)["parse"]["sections"]
+
+def get_section_html(title, index):
+    params = {"action": "parse", "format": "json", "page": title, "prop": "text", "section": index}
+    return get_json(API_URL, params)["parse"]["text"]["*"]
+
+def get_section_text(title, index, saved=None):
+    return html_to_text(get_section_html(title, index), saved)
+
+def get_page_html(title):
+    # Devuelve (html, revid) de la página completa siguiendo redirecciones
+    params = {"action": "parse", "format": "json", "page": title, "prop": "text|revid", "redirects": True}
+    parsed = get_json(API_URL, params)["parse"]
+    return parsed["text"]["*"], parsed.get("revid")
+
+def extract_lead_section(title, on_revision=None, saved=None):
+    html, revid = get_page_html(title)
+    if on_revision:
+        on_revision(title, revid)
+    return lead_text_from_html(html, saved)
+
+def extract_all_sections(title, excluded=EXCLUDED_SECTIONS, on_revision=None, on_clean=None):
+    # on_clean(título, tokens que quedan, tokens quitados del DOM) por página
+    saved = []
+    text = extract_lead_section(title, on_revision, saved) + " "
+    for sec in get_section_index(title):
+        if sec['line'].strip() not in excluded:
+            text += get_section_text(title, sec['index'], saved) + " "
+    text = preprocess_text(text)
+    if on_clean:
+        on_clean(title, approx_tokens(text), sum(saved))
+    return text
+
+def get_theory_links(title, target_sections):
+    # {etiqueta: título} de las teorías enlazadas en las secciones indicadas
+    section_indices = {s['line'].strip(): s['index'] for s in get_section_index(title) if s['line'].strip() in target_sections}
+    links = {}
+    for section_name, index in section_indices.items():
+        for label, target in extract_link_targets_from_html(get_section_html(title, index)).items():
+            links.setdefault(label, target)
+    return links
+
+def get_theory_titles(title, target_sections):
+    return set(get_theory_links(title, target_sections))
+
+# === CONSULTAS EN LOTE (action=query) ===
+# Hasta BATCH_TITLES títulos por petición, siguiendo "continue" hasta agotar
+# los resultados. Sirven para armar el grafo de enlaces sin descargar HTML.
+def batched(items, size=BATCH_TITLES):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def query_all(params):
+    params = dict(params, action="query", format="json", formatversion=2)
+    while True:
+        res = get_json(API_URL, params)
+        yield res
+        if "continue" not in res:
+            break
+        params.update(res["continue"])
+
+def resolve_titles(titles):
+    # {título pedido: título canónico}, siguiendo normalizaciones y redirecciones
+    resolved = {}
+    for batch in batched(sorted(set(titles))):
+        for res in query_all({"titles": "|".join(batch), "redirects": 1}):
+            query = res.get("query", {})
+            step = {r["from"]: r["to"] for r in query.get("normalized", []) + query.get("redirects", [])}
+            for title in batch:
+                target = title
+                while target in step and step[target] != target:
+                    target = step[target]
+                resolved[title] = target
+    return resolved
+
+def get_redirects(titles):
+    # {redirección: título canónico} para cada página de `titles`
+    redirects = {}
+    for batch in batched(sorted(set(titles))):
+        for res in query_all({"titles": "|".join(batch), "prop": "redirects", "rdlimit": "max", "rdnamespace": 0}):
+            for page in res.get("query", {}).get("pages", []):
+                for redirect in page.get("redirects", []):
+                    redirects[redirect["title"]] = page["title"]
+    return redirects
+
+def get_internal_links(titles, targets=None):
+    # {título: set(enlaces)} con prop=links. Si se pasa `targets`, el filtro se
+    # hace en el servidor (pltitles) y solo vuelven los enlaces hacia esos títulos.
+    links = {}
+    target_batches = list(batched(sorted(set(targets)))) if targets is not None else [None]
+    for batch in batched(sorted(set(titles))):
+        for target_batch in target_batches:
+            params = {"titles": "|".join(batch), "prop": "links", "pllimit": "max", "plnamespace": 0}
+            if target_batch is not None:
+                params["pltitles"] = "|".join(target_batch)
+            for res in query_all(params):
+                for page in res.get("query", {}).get("pages", []):
+                    links.setdefault(page["title"], set()).update(link["title"] for link in page.get("links", []))
+    return links
+
+def get_link_graph(titles):
+    # Aristas (origen, destino) entre páginas del conjunto `titles`, ambas en
+    # forma canónica. Los enlaces que pasan por una redirección hacia una teoría
+    # también cuentan. Devuelve también el mapa título pedido -> canónico.
+    canonical = resolve_titles(titles)
+    theory_set = set(canonical.values())
+    aliases = {title: title for title in theory_set}
+    aliases.update(get_redirects(theory_set))
+    links = get_internal_links(theory_set, targets=aliases)
+    edges = sorted({(source, aliases[target]) for source, found in links.items() if source in theory_set
+                    for target in found if target in aliases})
+    return edges, canonical
@@ -0,0 +1,231 @@
+import argparse
+import csv
+import multiprocessing as mp
+import time
+import numpy as np
+
+from layout import load_graph
+
+# === BROTE SOBRE UNA RED DE CONTACTOS ===
+# main.py solo genera un árbol de contagios sintético. Aquí el brote corre sobre
+# una red dada (CSV de aristas o GEXF): la red se guarda en CSR y en cada paso
+# de tiempo discreto se expande la frontera de infectados de todas las
+# réplicas a la vez, con un sorteo Bernoulli por arista (frontera x vecinos)
+# procesado en lotes de aristas para acotar la memoria.
+# SIR: infectado -> recuperado con prob. GAMMA por paso. SIS: vuelve a susceptible.
+BETA = 0.05               # Probabilidad de contagio por arista y paso
+GAMMA = 0.2               # Probabilidad de recuperación por paso
+INITIAL_CASES = 5         # Casos índice por réplica (como initial_cases en main.py)
+REPLICATES = 100
+MAX_STEPS = 1000
+EDGE_BATCH = 5_000_000    # Aristas sorteadas por lote
+SEED = None
+
+SUSCEPTIBLE, INFECTED, RECOVERED = 0, 1, 2
+
+
+# === RED EN CSR ===
+def to_csr(graph, directed=False):
+    n = len(graph["ids"])
+    source, target = graph["source"].astype(np.int64), graph["target"].astype(np.int64)
+    if not directed:
+        source, target = np.r_[source, target], np.r_[target, source]
+    keep = source != target
+    source, target = source[keep], target[keep]
+    order = np.argsort(source, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=n), out=indptr[1:])
+    return indptr, target[order].astype(np.int32)
+
+
+def edge_batches(degree, budget=EDGE_BATCH):
+    # Cortes de la frontera para que cada lote tenga a lo sumo `budget` aristas
+    cumulative = np.cumsum(degree)
+    start = 0
+    while start < len(degree):
+        end = max(int(np.searchsorted(cumulative, cumulative[start] - degree[start] + budget, side="right")),
+                  start + 1)
+        yield start, end
+        start = end
+
+
+def expand(indptr, indices, replica, node):
+    # Todas las aristas salientes de los pares (réplica, nodo) de la frontera
+    degree = indptr[node + 1] - indptr[node]
+    total = int(degree.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(degree) - degree, degree)
+    neighbors = indices[np.repeat(indptr[node], degree) + offsets]
+    return np.repeat(replica, degree), np.repeat(node, degree), neighbors
+
+
+# === SIMULACIÓN ===
+def simulate(indptr, indices, beta=BETA, gamma=GAMMA, model="SIR", replicates=REPLICATES,
+             initial_cases=INITIAL_CASES, max_steps=MAX_STEPS, seed=SEED, batch=EDGE_BATCH):
+    rng = np.random.default_rng(seed)
+    n = len(indptr) - 1
+    state = np.zeros((replicates, n), dtype=np.int8)
+    for r in range(replicates):
+        state[r, rng.choice(n, size=min(initial_cases, n), replace=False)] = INFECTED
+    seeds = [np.flatnonzero(state[r] == INFECTED) for r in range(replicates)]
+    events = []  # (réplica, origen, destino, paso)
+    curve = [np.count_nonzero(state == INFECTED, axis=1)]
+
+    for step in range(1, max_steps + 1):
+        replica, node = np.nonzero(state == INFECTED)
+        if len(node) == 0:
+            break
+        degree = indptr[node + 1] - indptr[node]
+        new_replica, new_source, new_target = [], [], []
+        for lo, hi in edge_batches(degree, batch):
+            r, src, dst = expand(indptr, indices, replica[lo:hi], node[lo:hi])
+            hit = (state[r, dst] == SUSCEPTIBLE) & (rng.random(len(dst)) < beta)
+            new_replica.append(r[hit])
+            new_source.append(src[hit])
+            new_target.append(dst[hit])
+        r, src, dst = np.concatenate(new_replica), np.concatenate(new_source), np.concatenate(new_target)
+        # Un susceptible alcanzado por varios infectados: se queda con un contagiador al azar
+        shuffle = rng.permutation(len(dst))
+        _, first = np.unique(r[shuffle].astype(np.int64) * n + dst[shuffle], return_index=True)
+        chosen = shuffle[first]
+        r, src, dst = r[chosen], src[chosen], dst[chosen]
+
+        # Recuperaciones de los que ya estaban infectados, después los nuevos contagios
+        recover = rng.random(len(node)) < gamma
+        state[replica[recover], node[recover]] = RECOVERED if model == "SIR" else SUSCEPTIBLE
+        state[r, dst] = INFECTED
+        events.append(np.column_stack([r, src, dst, np.full(len(dst), step)]))
+        curve.append(np.count_nonzero(state == INFECTED, axis=1))
+
+    events = np.concatenate(events) if events else np.zeros((0, 4), dtype=np.int64)
+    return {"events": events.astype(np.int64), "curve": np.array(curve).T, "seeds": seeds, "state": state}
+
+
+def _simulate_block(task):
+    indptr, indices, kwargs = task
+    return simulate(indptr, indices, **kwargs)
+
+
+def simulate_parallel(indptr, indices, replicates=REPLICATES, workers=1, seed=SEED, **kwargs):
+    # Las réplicas se reparten en bloques entre procesos, cada uno con su semilla
+    if workers <= 1:
+        return simulate(indptr, indices, replicates=replicates, seed=seed, **kwargs)
+    sizes = [len(b) for b in np.array_split(np.arange(replicates), workers) if len(b)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(indptr, indices, dict(kwargs, replicates=size, seed=s)) for size, s in zip(sizes, seeds)]
+    with mp.Pool(len(tasks)) as pool:
+        parts = pool.map(_simulate_block, tasks)
+    offset, events, seeds_out, curves, states = 0, [], [], [], []
+    steps = max(p["curve"].shape[1] for p in parts)
+    for part, size in zip(parts, sizes):
+        part_events = part["events"].copy()
+        part_events[:, 0] += offset
+        events.append(part_events)
+        seeds_out.extend(part["seeds"])
+        # Las curvas se completan con el último valor hasta el paso más largo
+        curve = part["curve"]
+        curves.append(np.pad(curve, ((0, 0), (0, steps - curve.shape[1])), mode="edge"))
+        states.append(part["state"])
+        offset += size
+    return {"events": np.concatenate(events), "curve": np.concatenate(curves), "seeds": seeds_out,
+            "state": np.concatenate(states)}
+
+
+# === RESUMEN ===
+def infected_keys(result, n):
+    # réplica * n + nodo de cada nodo infectado alguna vez (casos índice incluidos), sin repetir
+    seeds = [r * n + s.astype(np.int64) for r, s in enumerate(result["seeds"])]
+    events = result["events"]
+    return np.unique(np.concatenate(seeds + [events[:, 0] * n + events[:, 2]]))
+
+
+def summary(result, n):
+    # Infections cuenta contagios (en SIS un nodo puede contagiarse varias veces);
+    # AttackRate es la fracción de nodos distintos infectados alguna vez y
+    # Prevalence la fracción infectada al final de la simulación
+    events, curve = result["events"], result["curve"]
+    replicates = curve.shape[0]
+    infections = np.bincount(events[:, 0], minlength=replicates) + np.array([len(s) for s in result["seeds"]])
+    ever = np.bincount(infected_keys(result, n) // n, minlength=replicates)
+    rows = []
+    for r in range(replicates):
+        rows.append({"Replicate": r, "Infections": int(infections[r]), "AttackRate": ever[r] / n,
+                     "Prevalence": float(curve[r, -1] / n), "Peak": int(curve[r].max()), "PeakStep": int(curve[r].argmax()),
+                     "Duration": int(np.flatnonzero(curve[r])[-1]) + 1 if curve[r].any() else 0})
+    return rows
+
+
+def superspreading(result, n):
+    # Contagios secundarios por (réplica, infectado), con cero para los que no contagiaron
+    # a nadie, y fracción causada por el 20% más activo
+    keys = infected_keys(result, n)
+    events = result["events"]
+    if len(keys) == 0 or len(events) == 0:
+        return {"mean_offspring": 0.0, "top20_share": 0.0, "max_offspring": 0}
+    sources, counts = np.unique(events[:, 0] * n + events[:, 1], return_counts=True)
+    offspring = np.zeros(len(keys), dtype=np.int64)
+    offspring[np.searchsorted(keys, sources)] = counts
+    offspring = np.sort(offspring)[::-1]
+    top = offspring[:max(1, len(offspring) // 5)].sum()
+    return {"mean_offspring": float(offspring.mean()), "top20_share": float(top / offspring.sum()),
+            "max_offspring": int(offspring[0])}
+
+
+def write_tree(path, result, ids, replicate=0, with_step=False):
+    events = result["events"]
+    events = events[events[:, 0] == replicate]
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Source_ID', 'Target_ID'] + (['Step'] if with_step else []))
+        for _, source, target, step in events:
+            writer.writerow([ids[source], ids[target]] + ([step] if with_step else []))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SIR/SIS sobre una red de contactos (CSV de aristas o GEXF)")
+    parser.add_argument("graph")
+    parser.add_argument("--model", choices=["SIR", "SIS"], default="SIR")
+    parser.add_argument("--beta", type=float, default=BETA)
+    parser.add_argument("--gamma", type=float, default=GAMMA)
+    parser.add_argument("--replicates", type=int, default=REPLICATES)
+    parser.add_argument("--initial-cases", type=int, default=INITIAL_CASES)
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--directed", action="store_true", help="contagio solo en el sentido de la arista")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--tree", default="contagios_simulados.csv",
+                        help="contagios de la réplica 0 (árbol en SIR, registro de transmisiones en SIS)")
+    parser.add_argument("--with-step", action="store_true", help="agregar la columna Step al archivo de contagios")
+    parser.add_argument("--summary", default="epidemia_resumen.csv")
+    args = parser.parse_args()
+
+    graph = load_graph(args.graph)
+    indptr, indices = to_csr(graph, args.directed)
+    n = len(indptr) - 1
+    print(f"{n} nodos, {len(indices)} aristas en CSR ({'dirigida' if args.directed else 'no dirigida'})")
+
+    start = time.perf_counter()
+    result = simulate_parallel(indptr, indices, args.replicates, args.workers, args.seed, beta=args.beta,
+                               gamma=args.gamma, model=args.model, initial_cases=args.initial_cases,
+                               max_steps=args.max_steps)
+    elapsed = time.perf_counter() - start
+
+    rows = summary(result, n)
+    with open(args.summary, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    write_tree(args.tree, result, graph["ids"], with_step=args.with_step)
+
+    attack = np.array([row["AttackRate"] for row in rows])
+    prevalence = np.array([row["Prevalence"] for row in rows])
+    spread = superspreading(result, n)
+    print(f"{args.replicates} réplicas {args.model} en {elapsed:.2f} s, {len(result['events'])} contagios")
+    print(f"Tasa de ataque: media {attack.mean():.3f}, p10 {np.percentile(attack, 10):.3f}, "
+          f"p90 {np.percentile(attack, 90):.3f}")
+    if args.model == "SIS":
+        print(f"Prevalencia final: media {prevalence.mean():.3f}")
+    print(f"Contagios secundarios: media {spread['mean_offspring']:.2f}, máximo {spread['max_offspring']}, "
+          f"el 20% más activo causa el {100 * spread['top20_share']:.1f}%")
+    # En SIS un nodo se reinfecta: los contagios forman un registro de transmisiones, no un árbol
+    label = "Árbol de contagios" if args.model == "SIR" else "Registro de transmisiones"
+    print(f"{label} de la réplica 0 en {args.tree}, resumen en {args.summary}")
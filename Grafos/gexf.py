@@ -0,0 +1,245 @@
+import sys
+import time
+from array import array
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import quoteattr
+import numpy as np
+
+# === LECTOR GEXF EN STREAMING ===
+# Lee los GEXF exportados por Gephi (1.1draft / 1.2draft, con o sin viz) con
+# iterparse: cada <node>/<edge> se convierte apenas se cierra y se libera, sin
+# armar el DOM completo. Los valores se acumulan en buffers tipados
+# (array.array) y al final se entregan como arreglos NumPy:
+#   ids, labels          -> arreglos de texto por nodo
+#   x, y, z, size        -> float32 (NaN si el nodo no trae viz)
+#   color                -> uint8 (n, 3)
+#   source, target       -> int32, índices de nodo
+#   weight               -> float32 (1.0 por defecto)
+#   node_attrs / edge_attrs -> {título: arreglo tipado según la declaración}
+NUMERIC_TYPES = {"integer": "int64", "long": "int64", "float": "float64", "double": "float64"}
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_value(raw, kind):
+    if raw is None:
+        return None
+    if kind in ("integer", "long"):
+        return int(float(raw))
+    if kind in ("float", "double"):
+        return float(raw)
+    if kind == "boolean":
+        return raw.strip().lower() == "true"
+    return raw
+
+
+def typed_column(values, kind):
+    # Enteros con faltantes pasan a float64 con NaN
+    if kind in NUMERIC_TYPES:
+        if any(v is None for v in values):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        return np.array(values, dtype=NUMERIC_TYPES[kind])
+    if kind == "boolean":
+        return np.array([bool(v) for v in values], dtype=bool)
+    return np.array(values, dtype=object)
+
+
+class _Columns:
+    # Atributos declarados (<attributes>) de una clase: nodo o arista
+    def __init__(self):
+        self.declared = {}  # id -> (título, tipo, default)
+        self.values = {}    # id -> lista de valores por elemento
+
+    def declare(self, elem):
+        attr_id = elem.get("id")
+        default = next((parse_value(c.text, elem.get("type", "string")) for c in elem if local_name(c.tag) == "default"), None)
+        self.declared[attr_id] = (elem.get("title", attr_id), elem.get("type", "string"), default)
+        self.values[attr_id] = []
+
+    def set(self, found, k):
+        # found: {id: texto} del elemento k; los que faltan toman el default
+        for attr_id, (_, kind, default) in self.declared.items():
+            column = self.values[attr_id]
+            raw = found.get(attr_id)
+            value = parse_value(raw, kind) if raw is not None else default
+            if len(column) == k:
+                column.append(value)
+            else:
+                column.extend([default] * (k + 1 - len(column)))
+                column[k] = value
+
+    def arrays(self):
+        return {title: typed_column(self.values[attr_id], kind)
+                for attr_id, (title, kind, _) in self.declared.items()}
+
+
+def read_gexf(path):
+    ids, labels, index = [], [], {}
+    x, y, z, size = array("f"), array("f"), array("f"), array("f")
+    color = array("B")
+    source, target, weight = array("i"), array("i"), array("f")
+    edge_ids = []
+    node_cols, edge_cols = _Columns(), _Columns()
+    graph = {"directed": True, "mode": "static"}
+    attr_class = None
+    container = None
+
+    def node_index(node_id):
+        # Aristas hacia nodos no declarados: se agregan al vuelo
+        if node_id not in index:
+            index[node_id] = len(ids)
+            ids.append(node_id)
+            labels.append(node_id)
+            x.append(np.nan), y.append(np.nan), z.append(np.nan), size.append(np.nan)
+            color.extend((0, 0, 0))
+            node_cols.set({}, len(ids) - 1)
+        return index[node_id]
+
+    names = {}  # caché etiqueta con namespace -> nombre local
+    context = iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        name = names.get(elem.tag)
+        if name is None:
+            name = names[elem.tag] = local_name(elem.tag)
+        if event == "start":
+            if name == "graph":
+                graph["directed"] = elem.get("defaultedgetype", "undirected") == "directed"
+                graph["mode"] = elem.get("mode", "static")
+            elif name == "attributes":
+                attr_class = elem.get("class")
+            elif name in ("nodes", "edges"):
+                container = elem
+            continue
+
+        if name == "attribute":
+            (node_cols if attr_class == "node" else edge_cols).declare(elem)
+        elif name == "node":
+            # Si una arista anterior ya lo creó, solo se completan sus datos
+            node_id = elem.get("id")
+            k = node_index(node_id)
+            labels[k] = elem.get("label", node_id)
+            found = {}
+            for child in elem.iter():
+                child_name = names.get(child.tag)
+                if child_name == "attvalue":
+                    found[child.get("for") or child.get("id")] = child.get("value")
+                elif child_name == "position":
+                    x[k], y[k], z[k] = (float(child.get(axis, 0.0)) for axis in "xyz")
+                elif child_name == "size":
+                    size[k] = float(child.get("value", np.nan))
+                elif child_name == "color":
+                    color[3 * k:3 * k + 3] = array("B", (int(child.get(c, 0)) for c in "rgb"))
+            node_cols.set(found, k)
+            container.clear()  # suelta el <node> ya procesado
+        elif name == "edge":
+            s, t = elem.get("source"), elem.get("target")
+            source.append(index[s] if s in index else node_index(s))
+            target.append(index[t] if t in index else node_index(t))
+            w = elem.get("weight")
+            weight.append(float(w) if w is not None else 1.0)
+            edge_ids.append(elem.get("id"))
+            if edge_cols.declared:
+                found = {child.get("for") or child.get("id"): child.get("value")
+                         for child in elem.iter() if names.get(child.tag) == "attvalue"}
+                edge_cols.set(found, len(source) - 1)
+            container.clear()
+        elif name in ("nodes", "edges"):
+            root.clear()
+
+    n = len(ids)
+    for cols, count in ((node_cols, n), (edge_cols, len(source))):
+        for column in cols.values.values():
+            column.extend([None] * (count - len(column)))
+    return {
+        "directed": graph["directed"],
+        "mode": graph["mode"],
+        "ids": np.array(ids, dtype=object),
+        "labels": np.array(labels, dtype=object),
+        "x": np.frombuffer(x, dtype=np.float32).copy(),
+        "y": np.frombuffer(y, dtype=np.float32).copy(),
+        "z": np.frombuffer(z, dtype=np.float32).copy(),
+        "size": np.frombuffer(size, dtype=np.float32).copy(),
+        "color": np.frombuffer(color, dtype=np.uint8).reshape(n, 3).copy(),
+        "node_attrs": node_cols.arrays(),
+        "source": np.frombuffer(source, dtype=np.int32).copy(),
+        "target": np.frombuffer(target, dtype=np.int32).copy(),
+        "weight": np.frombuffer(weight, dtype=np.float32).copy(),
+        "edge_ids": np.array(edge_ids, dtype=object),
+        "edge_attrs": edge_cols.arrays(),
+    }
+
+
+# === ESCRITURA ===
+GEXF_TYPES = {"i": "integer", "u": "integer", "f": "double", "b": "boolean", "O": "string"}
+
+
+def _attribute_block(f, cls, attrs):
+    if not attrs:
+        return []
+    f.write(f'<attributes class="{cls}" mode="static">\n')
+    for i, (title, values) in enumerate(attrs.items()):
+        f.write(f'<attribute id="{i}" title={quoteattr(str(title))} type="{GEXF_TYPES[values.dtype.kind]}"/>\n')
+    f.write('</attributes>\n')
+    return list(attrs.values())
+
+
+def _attvalues(columns, k):
+    parts = []
+    for i, values in enumerate(columns):
+        v = values[k]
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            continue
+        v = str(v).lower() if values.dtype.kind == "b" else str(v)
+        parts.append(f'<attvalue for="{i}" value={quoteattr(v)}/>')
+    return f'<attvalues>{"".join(parts)}</attvalues>' if parts else ""
+
+
+def write_gexf(path, graph):
+    # GEXF 1.2 con viz: se escribe en streaming, igual que guardar_gexf_temporal
+    n = len(graph["ids"])
+    has_position = ~np.isnan(graph["x"])
+    has_size = ~np.isnan(graph["size"])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<gexf xmlns="http://www.gexf.net/1.2draft" xmlns:viz="http://www.gexf.net/1.2draft/viz" version="1.2">\n')
+        edge_type = "directed" if graph.get("directed", True) else "undirected"
+        f.write(f'<graph defaultedgetype="{edge_type}" mode="static">\n')
+        node_columns = _attribute_block(f, "node", graph.get("node_attrs", {}))
+        edge_columns = _attribute_block(f, "edge", graph.get("edge_attrs", {}))
+        f.write('<nodes>\n')
+        for k in range(n):
+            viz = ""
+            if has_position[k]:
+                viz += f'<viz:position x="{graph["x"][k]:.4f}" y="{graph["y"][k]:.4f}" z="{graph["z"][k]:.4f}"/>'
+            if has_size[k]:
+                viz += f'<viz:size value="{graph["size"][k]:.4f}"/>'
+            if graph["color"][k].any():
+                r, g, b = graph["color"][k]
+                viz += f'<viz:color r="{r}" g="{g}" b="{b}"/>'
+            f.write(f'<node id={quoteattr(str(graph["ids"][k]))} label={quoteattr(str(graph["labels"][k]))}>'
+                    f'{_attvalues(node_columns, k)}{viz}</node>\n')
+        f.write('</nodes>\n<edges>\n')
+        quoted = [quoteattr(str(node_id)) for node_id in graph["ids"]]
+        for i, (s, t, w) in enumerate(zip(graph["source"].tolist(), graph["target"].tolist(), graph["weight"].tolist())):
+            f.write(f'<edge id="{i}" source={quoted[s]} target={quoted[t]} '
+                    f'weight="{w:g}">{_attvalues(edge_columns, i) if edge_columns else ""}</edge>\n')
+        f.write('</edges>\n</graph>\n</gexf>\n')
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "Network.gexf"
+    start = time.perf_counter()
+    g = read_gexf(path)
+    elapsed = time.perf_counter() - start
+    print(f"{len(g['ids'])} nodos, {len(g['source'])} aristas "
+          f"({'dirigido' if g['directed'] else 'no dirigido'}) en {elapsed:.3f} s")
+    print(f"Posiciones viz: {int((~np.isnan(g['x'])).sum())} nodos")
+    for cls in ("node_attrs", "edge_attrs"):
+        for title, values in g[cls].items():
+            print(f"  {cls[:4]} {title}: {values.dtype}")
+    if len(sys.argv) > 2:
+        write_gexf(sys.argv[2], g)
+        print(f"Copia escrita en {sys.argv[2]}")
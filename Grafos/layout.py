@@ -0,0 +1,292 @@
+import argparse
+import csv
+import time
+import numpy as np
+
+from gexf import read_gexf, write_gexf
+
+# === FORCEATLAS2 SIN GEPHI ===
+# Implementación vectorizada de ForceAtlas2 (Jacomy et al., 2014) con los
+# mismos parámetros por defecto que Gephi. La repulsión usa Barnes–Hut: en cada
+# iteración se arma un quadtree con códigos de Morton (un sort y sumas por
+# nivel) y se recorre nivel por nivel con todos los pares (nodo, celda)
+# abiertos a la vez, sin bucles en Python por nodo.
+# Las posiciones que ya trae el GEXF (o un layout anterior) se usan como punto
+# de partida: solo los nodos nuevos se colocan cerca de sus vecinos.
+SCALING_RATIO = 2.0      # Gephi usa 10 con menos de 100 nodos
+GRAVITY = 1.0
+THETA = 1.2              # Barnes–Hut: abrir la celda si tamaño / distancia >= THETA
+JITTER_TOLERANCE = 1.0
+EDGE_WEIGHT_INFLUENCE = 1.0
+MAX_DEPTH = 16
+ITERATIONS = 300
+SEED = 42
+
+
+# === ENTRADA ===
+def read_edge_list(path):
+    # CSV con encabezado: las dos primeras columnas son origen y destino
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = [(r[0], r[1]) for r in list(csv.reader(f))[1:] if len(r) >= 2]
+    ids, inverse = np.unique(np.array(rows, dtype=object).ravel(), return_inverse=True)
+    inverse = inverse.reshape(-1, 2).astype(np.int32)
+    n, m = len(ids), len(rows)
+    nan = np.full(n, np.nan, dtype=np.float32)
+    return {"directed": True, "ids": ids, "labels": ids.copy(), "x": nan.copy(), "y": nan.copy(),
+            "z": np.zeros(n, dtype=np.float32), "size": nan.copy(), "color": np.zeros((n, 3), dtype=np.uint8),
+            "node_attrs": {}, "source": inverse[:, 0], "target": inverse[:, 1],
+            "weight": np.ones(m, dtype=np.float32), "edge_attrs": {}}
+
+
+def load_graph(path):
+    return read_gexf(path) if path.lower().endswith(".gexf") else read_edge_list(path)
+
+
+def initial_positions(graph, warm=None, seed=SEED):
+    # Posiciones del propio GEXF, o de otro layout (por id) con warm=...
+    rng = np.random.default_rng(seed)
+    n = len(graph["ids"])
+    pos = np.column_stack([graph["x"], graph["y"]]).astype(np.float64)
+    if warm is not None:
+        previous = {node_id: k for k, node_id in enumerate(warm["ids"])}
+        match = np.array([previous.get(node_id, -1) for node_id in graph["ids"]])
+        found = match >= 0
+        pos[found] = np.column_stack([warm["x"], warm["y"]])[match[found]]
+    known = ~np.isnan(pos).any(axis=1)
+    if not known.any():
+        return rng.uniform(-1, 1, (n, 2)) * np.sqrt(n) * 10, known
+
+    # Nodos nuevos: promedio de los vecinos ya ubicados (varias pasadas para
+    # cadenas de nodos nuevos) y al azar si no tienen ninguno
+    source, target = graph["source"], graph["target"]
+    spread = np.nanstd(pos[known], axis=0).mean() or 1.0
+    placed = known.copy()
+    for _ in range(10):
+        total, count = np.zeros((n, 2)), np.zeros(n)
+        for a, b in ((source, target), (target, source)):
+            ok = placed[b] & ~placed[a]
+            np.add.at(total, a[ok], pos[b[ok]])
+            np.add.at(count, a[ok], 1)
+        new = count > 0
+        if not new.any():
+            break
+        pos[new] = total[new] / count[new, None] + rng.normal(0, spread * 0.01, (new.sum(), 2))
+        placed |= new
+    lo, hi = pos[placed].min(axis=0), pos[placed].max(axis=0)
+    pos[~placed] = rng.uniform(lo, hi, ((~placed).sum(), 2))
+    return pos, known
+
+
+def scatter_add(index, values, n):
+    # Suma por nodo de vectores 2D (más rápido que np.add.at)
+    return np.column_stack([np.bincount(index, values[:, 0], minlength=n),
+                            np.bincount(index, values[:, 1], minlength=n)])
+
+
+# === QUADTREE (códigos de Morton) ===
+def part1by1(v):
+    v = v.astype(np.uint64) & np.uint64(0xFFFF)
+    for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def build_quadtree(pos, mass, depth):
+    # Por nivel: códigos de celda únicos (ordenados), masa y centro de masa
+    origin = pos.min(axis=0)
+    size = float((pos.max(axis=0) - origin).max()) * (1 + 1e-9) or 1.0
+    grid = np.clip(((pos - origin) / size * (1 << depth)).astype(np.int64), 0, (1 << depth) - 1)
+    codes = part1by1(grid[:, 0]) | (part1by1(grid[:, 1]) << np.uint64(1))
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    weighted = pos[order] * mass[order, None]
+    levels = []
+    for level in range(depth + 1):
+        level_codes = sorted_codes >> np.uint64(2 * (depth - level))
+        start = np.flatnonzero(np.r_[True, level_codes[1:] != level_codes[:-1]])
+        cell_mass = np.add.reduceat(mass[order], start)
+        center = np.add.reduceat(weighted, start, axis=0) / cell_mass[:, None]
+        levels.append({"codes": level_codes[start], "mass": cell_mass, "center": center,
+                       "size": size / (1 << level), "start": start})
+    levels[-1]["members"] = order
+    return levels, codes
+
+
+def repulsion(pos, mass, kr=SCALING_RATIO, theta=THETA, max_depth=MAX_DEPTH):
+    n = len(pos)
+    depth = int(min(max_depth, max(1, np.ceil(np.log(max(n, 2)) / np.log(4)) + 2)))
+    levels, codes = build_quadtree(pos, mass, depth)
+    force = np.zeros((n, 2))
+    nodes = np.arange(n)
+    cells = np.zeros(n, dtype=np.int64)
+    for level, tree in enumerate(levels):
+        own = (codes[nodes] >> np.uint64(2 * (depth - level))) == tree["codes"][cells]
+        cell_mass = tree["mass"][cells]
+        center = tree["center"][cells]
+        delta = pos[nodes] - center
+        dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-9)
+        accept = ~own & (tree["size"] ** 2 < theta ** 2 * dist2)
+        # F = kr * m_i * m_j / d en la dirección de la separación
+        factor = kr * mass[nodes[accept]] * cell_mass[accept] / dist2[accept]
+        force += scatter_add(nodes[accept], delta[accept] * factor[:, None], n)
+
+        if level == depth:
+            # Hojas cercanas: fuerza exacta contra cada nodo de la celda
+            near_nodes, near_cells = nodes[~accept], cells[~accept]
+            bounds = np.r_[tree["start"], len(pos)]
+            counts = bounds[near_cells + 1] - bounds[near_cells]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            i = np.repeat(near_nodes, counts)
+            j = tree["members"][np.repeat(bounds[near_cells], counts) + offsets]
+            i, j = i[i != j], j[i != j]
+            delta = pos[i] - pos[j]
+            dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-9)
+            force += scatter_add(i, delta * (kr * mass[i] * mass[j] / dist2)[:, None], n)
+            break
+
+        # Abrir las celdas cercanas: sus hasta 4 hijas no vacías
+        open_nodes, open_cells = nodes[~accept], cells[~accept]
+        if len(open_nodes) == 0:
+            break
+        child_codes = (tree["codes"][open_cells][:, None] << np.uint64(2)) + np.arange(4, dtype=np.uint64)
+        next_codes = levels[level + 1]["codes"]
+        idx = np.searchsorted(next_codes, child_codes.ravel())
+        idx_clip = np.minimum(idx, len(next_codes) - 1)
+        exists = next_codes[idx_clip] == child_codes.ravel()
+        nodes = np.repeat(open_nodes, 4)[exists]
+        cells = idx_clip[exists]
+    return force
+
+
+def attraction(pos, mass, source, target, weight, lin_log=False, dissuade_hubs=False,
+               edge_weight_influence=EDGE_WEIGHT_INFLUENCE):
+    delta = pos[source] - pos[target]
+    w = weight.astype(np.float64) ** edge_weight_influence if edge_weight_influence != 1 else weight.astype(np.float64)
+    if lin_log:
+        dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1e-9)
+        w = w * np.log1p(dist) / dist
+    if dissuade_hubs:
+        w = w / mass[source]
+    pull = delta * w[:, None]
+    return scatter_add(target, pull, len(pos)) - scatter_add(source, pull, len(pos))
+
+
+def gravity(pos, mass, kg=GRAVITY, strong=False):
+    if strong:
+        return -kg * mass[:, None] * pos
+    dist = np.maximum(np.sqrt((pos ** 2).sum(axis=1)), 1e-9)
+    return -kg * (mass / dist)[:, None] * pos
+
+
+# === ITERACIÓN ===
+def forceatlas2(graph, iterations=ITERATIONS, pos=None, scaling_ratio=SCALING_RATIO, gravity_constant=GRAVITY,
+                theta=THETA, lin_log=False, dissuade_hubs=False, strong_gravity=False,
+                jitter_tolerance=JITTER_TOLERANCE, seed=SEED, verbose=False):
+    n = len(graph["ids"])
+    source, target, weight = graph["source"], graph["target"], graph["weight"]
+    # Masa = grado + 1, como en Gephi
+    mass = 1.0 + np.bincount(source, minlength=n) + np.bincount(target, minlength=n)
+    if pos is None:
+        pos, _ = initial_positions(graph, seed=seed)
+    pos = pos.astype(np.float64).copy()
+    previous = np.zeros_like(pos)
+    speed, speed_efficiency = 1.0, 1.0
+
+    for it in range(iterations):
+        force = (repulsion(pos, mass, scaling_ratio, theta)
+                 + attraction(pos, mass, source, target, weight, lin_log, dissuade_hubs)
+                 + gravity(pos, mass, gravity_constant, strong_gravity))
+
+        # Velocidad adaptativa (swinging / traction) igual que en Gephi
+        swinging = mass * np.sqrt(((force - previous) ** 2).sum(axis=1))
+        traction = mass * np.sqrt(((force + previous) ** 2).sum(axis=1)) / 2
+        total_swinging, total_traction = swinging.sum(), traction.sum()
+        estimated = 0.05 * np.sqrt(n)
+        jt = jitter_tolerance * max(np.sqrt(estimated), min(10.0, estimated * total_traction / n ** 2))
+        if total_swinging / max(total_traction, 1e-12) > 2.0:
+            speed_efficiency = speed_efficiency * 0.5 if speed_efficiency > 0.05 else speed_efficiency
+            jt = max(jt, jitter_tolerance)
+        target_speed = jt * speed_efficiency * total_traction / max(total_swinging, 1e-12)
+        if total_swinging > jt * total_traction:
+            speed_efficiency = speed_efficiency * 0.7 if speed_efficiency > 0.05 else speed_efficiency
+        elif speed < 1000:
+            speed_efficiency *= 1.3
+        speed = speed + min(target_speed - speed, 0.5 * speed)
+
+        factor = speed / (1.0 + np.sqrt(speed * swinging))
+        pos += force * factor[:, None]
+        previous = force
+        if verbose and (it % 50 == 0 or it == iterations - 1):
+            print(f"  iteración {it}: velocidad {speed:.4f}, swinging {total_swinging:.3g}")
+    return pos
+
+
+# === SALIDA ===
+def with_positions(graph, pos):
+    out = dict(graph)
+    out["x"] = pos[:, 0].astype(np.float32)
+    out["y"] = pos[:, 1].astype(np.float32)
+    out["z"] = np.zeros(len(pos), dtype=np.float32)
+    degree = np.bincount(graph["source"], minlength=len(pos)) + np.bincount(graph["target"], minlength=len(pos))
+    if np.isnan(graph["size"]).all():
+        out["size"] = (2.0 + np.sqrt(degree)).astype(np.float32)
+    return out
+
+
+def render(graph, pos, paths, node_size=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    n = len(pos)
+    degree = np.bincount(graph["source"], minlength=n) + np.bincount(graph["target"], minlength=n)
+    sizes = node_size if node_size is not None else 1.0 + 4.0 * np.sqrt(degree) / max(1.0, np.sqrt(n) / 30)
+    colors = graph["color"] / 255.0 if graph["color"].any() else np.log1p(degree)
+    fig, ax = plt.subplots(figsize=(12, 12))
+    segments = np.stack([pos[graph["source"]], pos[graph["target"]]], axis=1)
+    alpha = max(0.05, min(0.6, 300.0 / max(1, len(segments)) ** 0.5))
+    ax.add_collection(LineCollection(segments, colors="gray", linewidths=0.3, alpha=alpha, zorder=1))
+    ax.scatter(pos[:, 0], pos[:, 1], s=sizes, c=colors, cmap="viridis", linewidths=0, zorder=2)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    fig.tight_layout()
+    for path in paths:
+        fig.savefig(path, dpi=200)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layout ForceAtlas2 (Barnes–Hut) sin GUI")
+    parser.add_argument("graph", help="GEXF o CSV de aristas (Source_ID,Target_ID)")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--warm", help="GEXF con posiciones de un layout anterior")
+    parser.add_argument("--scaling", type=float, default=None)
+    parser.add_argument("--gravity", type=float, default=GRAVITY)
+    parser.add_argument("--theta", type=float, default=THETA)
+    parser.add_argument("--lin-log", action="store_true")
+    parser.add_argument("--dissuade-hubs", action="store_true")
+    parser.add_argument("--strong-gravity", action="store_true")
+    parser.add_argument("--out", default="layout.gexf")
+    parser.add_argument("--png", default="layout.png")
+    parser.add_argument("--svg", default=None)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    graph = load_graph(args.graph)
+    n = len(graph["ids"])
+    warm = read_gexf(args.warm) if args.warm else None
+    pos, known = initial_positions(graph, warm, args.seed)
+    scaling = args.scaling if args.scaling is not None else (10.0 if n < 100 else SCALING_RATIO)
+    print(f"{n} nodos, {len(graph['source'])} aristas; {int(known.sum())} con posición previa")
+
+    start = time.perf_counter()
+    pos = forceatlas2(graph, args.iterations, pos, scaling, args.gravity, args.theta, args.lin_log,
+                      args.dissuade_hubs, args.strong_gravity, seed=args.seed, verbose=True)
+    print(f"Layout en {time.perf_counter() - start:.1f} s")
+
+    write_gexf(args.out, with_positions(graph, pos))
+    images = [p for p in (args.png, args.svg) if p]
+    if images:
+        render(graph, pos, images)
+    print(f"Escrito {args.out}" + (f" y {', '.join(images)}" if images else ""))
@@ -1,56 +1,161 @@
 import random
 import csv
+import heapq
+import sys
+from xml.sax.saxutils import quoteattr
 
 # Parámetros de generación
 N = 1000  # Número de contagios (aristas)
 initial_cases = 5  # Pacientes iniciales (casos índice)
 
-# Inicializar listas
-events = []         # Lista de contagios (Source_ID, Target_ID)
-patients = []       # Lista de todos los pacientes conocidos
-available_sources = []  # Pacientes que pueden contagiar
-
-# Crear pacientes iniciales
-for i in range(initial_cases):
-    patient_id = f"P{str(i+1).zfill(4)}"
-    patients.append(patient_id)
-    available_sources.append(patient_id)
-
-# Contador de IDs nuevos
-current_patient_num = initial_cases + 1
-
-# Generar eventos de contagio
-while len(events) < N:
-    if not available_sources:
-        # Si no hay fuentes disponibles, reiniciamos con un caso nuevo
-        new_patient = f"P{str(current_patient_num).zfill(4)}"
+# Parámetros del modo temporal (python main.py temporal)
+MAX_CONTAGIOS = 5         # Máximo de contagios por paciente
+TASA_CONTAGIO = 0.5       # Contactos infecciosos por unidad de tiempo (exponencial)
+RECUPERACION_FORMA = 2.0  # Forma de la gamma del tiempo de recuperación
+RECUPERACION_MEDIA = 7.0  # Duración media de la infección
+SEMILLA = None            # Fijar un entero para simulaciones reproducibles
+
+
+def patient_name(num):
+    return f"P{str(num).zfill(4)}"
+
+
+# === MODO ESTÁTICO (árbol de contagio sin tiempo) ===
+def generar_estatico(N, initial_cases):
+    # Inicializar listas
+    events = []         # Lista de contagios (Source_ID, Target_ID)
+    patients = []       # Lista de todos los pacientes conocidos
+    available_sources = []  # Pacientes que pueden contagiar
+
+    # Crear pacientes iniciales
+    for i in range(initial_cases):
+        patient_id = patient_name(i + 1)
+        patients.append(patient_id)
+        available_sources.append(patient_id)
+
+    # Contador de IDs nuevos
+    current_patient_num = initial_cases + 1
+
+    # Generar eventos de contagio
+    while len(events) < N:
+        if not available_sources:
+            # Si no hay fuentes disponibles, reiniciamos con un caso nuevo
+            new_patient = patient_name(current_patient_num)
+            current_patient_num += 1
+            patients.append(new_patient)
+            available_sources.append(new_patient)
+
+        # Elegir un contagiador aleatoriamente entre los disponibles
+        source = random.choice(available_sources)
+
+        # Crear un nuevo paciente
+        target = patient_name(current_patient_num)
+        current_patient_num += 1
+
+        # Registrar el evento
+        events.append((source, target))
+        patients.append(target)
+
+        # El nuevo paciente también puede contagiar a otros
+        available_sources.append(target)
+
+        # Opcional: limitar capacidad de contagio de un paciente
+        # (por ejemplo, un paciente puede contagiar solo a 5 personas máximo)
+        if events.count((source, target)) > 5:
+            available_sources.remove(source)
+
+    return events, patients
+
+
+# === MODO TEMPORAL (simulación por eventos con cola de prioridad) ===
+# Cada paciente recibe un tiempo de infección y uno de recuperación (gamma).
+# Mientras está infeccioso genera contactos separados por tiempos exponenciales;
+# cada contacto es un evento en un heap, así que cada paso cuesta O(log n).
+def generar_temporal(N, initial_cases, rng=random):
+    events = []        # (Source_ID, Target_ID, Time)
+    spells = {}        # Paciente -> (inicio, fin) de la infección
+    queue = []         # Heap de (tiempo, secuencia, fuente)
+    seq = 0
+    scale = RECUPERACION_MEDIA / RECUPERACION_FORMA
+    current_patient_num = 1
+    contagios = {}
+
+    def infectar(t):
+        nonlocal current_patient_num, seq
+        patient_id = patient_name(current_patient_num)
         current_patient_num += 1
-        patients.append(new_patient)
-        available_sources.append(new_patient)
+        recovery = t + rng.gammavariate(RECUPERACION_FORMA, scale)
+        spells[patient_id] = (t, recovery)
+        contagios[patient_id] = 0
+        contact = t + rng.expovariate(TASA_CONTAGIO)
+        if contact < recovery:
+            heapq.heappush(queue, (contact, seq, patient_id))
+            seq += 1
+        return patient_id
+
+    for _ in range(initial_cases):
+        infectar(0.0)
+
+    now = 0.0
+    while len(events) < N:
+        if not queue:
+            # Brote extinguido: reiniciamos con un caso nuevo en el tiempo actual
+            infectar(now)
+            continue
+
+        now, _, source = heapq.heappop(queue)
+        target = infectar(now)
+        events.append((source, target, now))
+        contagios[source] += 1
+
+        # Programar el siguiente contacto de la fuente si sigue infecciosa
+        contact = now + rng.expovariate(TASA_CONTAGIO)
+        if contagios[source] < MAX_CONTAGIOS and contact < spells[source][1]:
+            heapq.heappush(queue, (contact, seq, source))
+            seq += 1
+
+    return events, spells
+
+
+def guardar_gexf_temporal(path, events, spells):
+    # GEXF dinámico con intervalos start/end para la línea de tiempo de Gephi
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n')
+        f.write('<graph defaultedgetype="directed" mode="dynamic" timeformat="double">\n')
+        f.write('<nodes>\n')
+        for patient_id, (start, end) in spells.items():
+            name = quoteattr(patient_id)
+            f.write(f'<node id={name} label={name} start="{start:.6f}" end="{end:.6f}"/>\n')
+        f.write('</nodes>\n<edges>\n')
+        for i, (source, target, t) in enumerate(events):
+            end = spells[target][1]
+            f.write(f'<edge id="{i}" source={quoteattr(source)} target={quoteattr(target)} '
+                    f'start="{t:.6f}" end="{end:.6f}"/>\n')
+        f.write('</edges>\n</graph>\n</gexf>\n')
 
-    # Elegir un contagiador aleatoriamente entre los disponibles
-    source = random.choice(available_sources)
 
-    # Crear un nuevo paciente
-    target = f"P{str(current_patient_num).zfill(4)}"
-    current_patient_num += 1
+if __name__ == "__main__":
+    modo = sys.argv[1] if len(sys.argv) > 1 else "estatico"
 
-    # Registrar el evento
-    events.append((source, target))
-    patients.append(target)
+    if modo == "temporal":
+        rng = random.Random(SEMILLA)
+        events, spells = generar_temporal(N, initial_cases, rng)
 
-    # El nuevo paciente también puede contagiar a otros
-    available_sources.append(target)
+        with open('contagios_temporal.csv', 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Source_ID', 'Target_ID', 'Time'])
+            writer.writerows((s, t, f"{time:.6f}") for s, t, time in events)
+        guardar_gexf_temporal('contagios_temporal.gexf', events, spells)
 
-    # Opcional: limitar capacidad de contagio de un paciente
-    # (por ejemplo, un paciente puede contagiar solo a 5 personas máximo)
-    if events.count((source, target)) > 5:
-        available_sources.remove(source)
+        print(f"CSV y GEXF temporales generados con {len(events)} contagios y {len(spells)} pacientes.")
+    else:
+        events, patients = generar_estatico(N, initial_cases)
 
-# Guardar el CSV
-with open('contagios.csv', 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['Source_ID', 'Target_ID'])
-    writer.writerows(events)
+        # Guardar el CSV
+        with open('contagios.csv', 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Source_ID', 'Target_ID'])
+            writer.writerows(events)
 
-print(f"CSV generado con {len(events)} contagios y {len(patients)} pacientes.")
+        print(f"CSV generado con {len(events)} contagios y {len(patients)} pacientes.")
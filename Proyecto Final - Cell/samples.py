@@ -0,0 +1,110 @@
+import os
+import pickle
+import sys
+import numpy as np
+import pandas as pd
+
+# === CONFIGURACIÓN ===
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "igsr_samples_Medillin.tsv")
+CACHE_SUFFIX = ".cache.pkl"
+
+CATEGORICAL = ["Sex", "Population code", "Population name", "Superpopulation code",
+               "Superpopulation name", "Population elastic ID"]
+INDEXED = {"population": "Population code", "superpopulation": "Superpopulation code", "sex": "Sex"}
+
+
+# === COLECCIONES ===
+# "Data collections" viene separado por comas, pero algunos nombres también
+# llevan coma ("Human Genome Structural Variation Consortium, Phase 2"): un
+# trozo que empieza con espacio continúa el nombre anterior.
+def split_collections(value):
+    names = []
+    for piece in str(value).split(","):
+        if not piece.strip():
+            continue
+        if piece.startswith(" ") and names:
+            names[-1] += "," + piece
+        else:
+            names.append(piece.strip())
+    return names
+
+
+def membership_matrix(column):
+    rows = [split_collections(v) if isinstance(v, str) else [] for v in column]
+    collections = sorted({name for row in rows for name in row})
+    position = {name: j for j, name in enumerate(collections)}
+    membership = np.zeros((len(rows), len(collections)), dtype=bool)
+    for i, row in enumerate(rows):
+        membership[i, [position[name] for name in row]] = True
+    return collections, membership
+
+
+def build_index(column):
+    codes, uniques = pd.factorize(column)
+    return {value: np.flatnonzero(codes == k) for k, value in enumerate(uniques)}
+
+
+# === CARGA ===
+def parse_samples(path):
+    df = pd.read_csv(path, sep="\t", dtype=str, keep_default_na=False)
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    collections, membership = membership_matrix(df.pop("Data collections"))
+    return {
+        "samples": df,
+        "collections": collections,
+        "membership": membership,
+        "index": {key: build_index(df[col].astype(str)) for key, col in INDEXED.items()},
+    }
+
+
+# El resultado parseado se guarda en binario al lado del TSV y se invalida por mtime
+def load_samples(path=DEFAULT_PATH, use_cache=True):
+    cached = path + CACHE_SUFFIX
+    if use_cache and os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        with open(cached, "rb") as f:
+            return pickle.load(f)
+
+    sheet = parse_samples(path)
+    if use_cache:
+        with open(cached, "wb") as f:
+            pickle.dump(sheet, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return sheet
+
+
+# === CONSULTAS ===
+# Todas las condiciones se combinan como máscaras booleanas sobre las muestras.
+def collection_mask(sheet, collections, require="all"):
+    missing = [name for name in collections if name not in sheet["collections"]]
+    if missing:
+        raise KeyError(f"Colecciones desconocidas: {missing}")
+    columns = [sheet["collections"].index(name) for name in collections]
+    selected = sheet["membership"][:, columns]
+    return selected.all(axis=1) if require == "all" else selected.any(axis=1)
+
+
+def query(sheet, population=None, superpopulation=None, sex=None, collections=None, require="all"):
+    mask = np.ones(len(sheet["samples"]), dtype=bool)
+    for key, value in (("population", population), ("superpopulation", superpopulation), ("sex", sex)):
+        if value is None:
+            continue
+        index_mask = np.zeros_like(mask)
+        index_mask[sheet["index"][key].get(value, [])] = True
+        mask &= index_mask
+    if collections:
+        mask &= collection_mask(sheet, collections, require)
+    return sheet["samples"][mask]
+
+
+def collection_counts(sheet):
+    return pd.Series(sheet["membership"].sum(axis=0), index=sheet["collections"]).sort_values(ascending=False)
+
+
+if __name__ == "__main__":
+    sheet = load_samples(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    print(f"{len(sheet['samples'])} muestras, {len(sheet['collections'])} colecciones")
+    print(collection_counts(sheet))
+
+    clm_30x = query(sheet, population="CLM", collections=["1000 Genomes 30x on GRCh38"])
+    print(f"\nMuestras CLM en '1000 Genomes 30x on GRCh38': {len(clm_30x)}")
+    print(clm_30x["Sex"].value_counts())
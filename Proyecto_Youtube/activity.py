@@ -0,0 +1,177 @@
+import argparse
+import os
+import pandas as pd
+
+from loader import load_comments, DEFAULT_PATH
+
+# === PARÁMETROS ===
+BUCKET = "1h"            # Tamaño de cubeta sobre time_parsed
+ROLLING_WINDOW = 24      # Cubetas de la ventana móvil de la tasa de comentarios
+STATE_DIR = "activity_state"
+
+TABLES = {
+    "buckets": ["bucket"],
+    "authors": ["author", "bucket"],
+}
+
+
+# === CUBETAS VECTORIZADAS ===
+# time_parsed es un epoch en segundos; se trunca a la cubeta sin pasar por las
+# cadenas "4 hours ago". Para el sentimiento se pondera cada comentario por
+# votes + 1, así los comentarios sin votos siguen contando.
+def comment_rows(df, scores=None, bucket=BUCKET):
+    # Una fila por comentario con lo que aporta a las tablas: cubeta, autor, votos y polaridad
+    rows = pd.DataFrame({
+        "cid": df["cid"].astype(str),
+        "author": df["author"].astype(str),
+        "bucket": pd.to_datetime(df["time_parsed"], unit="s").dt.floor(bucket),
+        "votes": df["votes"],
+    })
+    if scores is not None:
+        rows["polarity"] = rows["cid"].map(scores.assign(cid=scores["cid"].astype(str)).set_index("cid")["Polarity"])
+    else:
+        rows["polarity"] = float("nan")
+    return rows.reset_index(drop=True)
+
+
+def row_tables(rows, sign=1):
+    # sign=-1 resta el aporte de filas ya contadas (para aplicar deltas)
+    data = rows.dropna(subset=["bucket"]).copy()
+    data["comments"] = sign
+    weight = data["votes"] + 1
+    data["scored_weight"] = sign * weight.where(data["polarity"].notna(), 0)
+    data["weighted_polarity"] = sign * (data["polarity"] * weight).fillna(0.0)
+    data["votes"] = sign * data["votes"]
+
+    buckets = data.groupby("bucket").agg(
+        comments=("comments", "sum"),
+        votes=("votes", "sum"),
+        scored_weight=("scored_weight", "sum"),
+        weighted_polarity=("weighted_polarity", "sum"),
+    ).reset_index()
+    authors = data.groupby(["author", "bucket"]).agg(
+        comments=("comments", "sum"),
+        votes=("votes", "sum"),
+    ).reset_index()
+    return {"buckets": buckets, "authors": authors}
+
+
+def bucket_tables(df, scores=None, bucket=BUCKET):
+    return row_tables(comment_rows(df, scores, bucket))
+
+
+def merge_tables(old, new, keys):
+    if old is None:
+        return new
+    return pd.concat([old, new]).groupby(keys, as_index=False).sum()
+
+
+# === ESTADO INCREMENTAL ===
+# Las tablas por cubeta y una fila por cid ya visto (cubeta, autor, votos,
+# polaridad) se guardan en STATE_DIR junto con el tamaño de cubeta. Un archivo
+# nuevo del scraper suma sus comentarios no vistos a las cubetas existentes;
+# de los ya vistos se aplica solo la diferencia de votos y de polaridad (por
+# ejemplo al pasar --scores en una corrida posterior), sin mover su cubeta.
+def load_state(state_dir=STATE_DIR):
+    state = {}
+    for name in list(TABLES) + ["seen", "meta"]:
+        path = os.path.join(state_dir, f"{name}.parquet")
+        state[name] = pd.read_parquet(path) if os.path.exists(path) else None
+    return state
+
+
+def save_state(state, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    for name, table in state.items():
+        if table is not None:
+            table.to_parquet(os.path.join(state_dir, f"{name}.parquet"), index=False)
+
+
+def check_state(state, bucket, state_dir=STATE_DIR):
+    if state["meta"] is not None and state["meta"]["bucket"].iloc[0] != bucket:
+        raise ValueError(f"{state_dir} se armó con cubetas de {state['meta']['bucket'].iloc[0]}, no {bucket}; "
+                         f"usar el mismo --bucket u otro --state")
+    if state["seen"] is not None and "votes" not in state["seen"]:
+        raise ValueError(f"{state_dir} no guarda votos ni polaridad por cid (formato anterior); usar otro --state")
+
+
+def update(df, scores=None, state_dir=STATE_DIR, bucket=BUCKET):
+    state = load_state(state_dir)
+    check_state(state, bucket, state_dir)
+    rows = comment_rows(df.drop_duplicates("cid"), scores, bucket)
+
+    seen = state["seen"]
+    if seen is not None:
+        known = rows["cid"].isin(seen["cid"])
+        fresh = rows[~known]
+        previous = seen.set_index("cid").loc[rows.loc[known, "cid"]].reset_index()
+        # Los ya vistos conservan cubeta y autor; sin puntaje nuevo se queda la polaridad anterior
+        current = previous.copy()
+        current["votes"] = rows.loc[known, "votes"].to_numpy()
+        polarity = rows.loc[known, "polarity"].to_numpy()
+        current["polarity"] = current["polarity"].where(pd.isna(polarity), polarity)
+        changed = ((current["votes"] != previous["votes"])
+                   | (current["polarity"].ne(previous["polarity"]) & current["polarity"].notna())).to_numpy()
+        previous, current = previous[changed], current[changed]
+    else:
+        fresh, previous, current = rows, rows.iloc[:0], rows.iloc[:0]
+
+    delta = [row_tables(fresh), row_tables(current), row_tables(previous, sign=-1)]
+    for name, keys in TABLES.items():
+        for tables in delta:
+            state[name] = merge_tables(state[name], tables[name], keys)
+    if seen is not None:
+        seen = pd.concat([seen[~seen["cid"].isin(current["cid"])], current, fresh], ignore_index=True)
+    state["seen"] = fresh if seen is None else seen
+    state["meta"] = pd.DataFrame({"bucket": [bucket]})
+
+    save_state(state, state_dir)
+    return state, len(fresh), len(current)
+
+
+# === SERIES ===
+def activity_series(state, bucket=BUCKET, window=ROLLING_WINDOW):
+    buckets = state["buckets"].set_index("bucket").sort_index()
+    full = pd.date_range(buckets.index.min(), buckets.index.max(), freq=bucket)
+    buckets = buckets.reindex(full, fill_value=0)
+
+    series = pd.DataFrame(index=full)
+    series["comments"] = buckets["comments"]
+    series["rolling_rate"] = buckets["comments"].rolling(window, min_periods=1).mean()
+    weight = buckets["scored_weight"].where(buckets["scored_weight"] > 0)
+    series["vote_weighted_polarity"] = buckets["weighted_polarity"] / weight
+    return series
+
+
+def author_activity(state):
+    authors = state["authors"]
+    summary = authors.groupby("author").agg(
+        comments=("comments", "sum"),
+        votes=("votes", "sum"),
+        active_buckets=("bucket", "size"),
+        first=("bucket", "min"),
+        last=("bucket", "max"),
+    )
+    return summary.sort_values("comments", ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Actividad de comentarios por cubetas de tiempo")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_PATH])
+    parser.add_argument("--scores", default=None, help="CSV de analyze_comments.py (cid, Polarity, ...)")
+    parser.add_argument("--state", default=STATE_DIR)
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--window", type=int, default=ROLLING_WINDOW)
+    parser.add_argument("--out", default="comment_activity.csv")
+    args = parser.parse_args()
+
+    scores = pd.read_csv(args.scores) if args.scores else None
+    for path in args.paths:
+        state, added, changed = update(load_comments(path), scores, args.state, args.bucket)
+        print(f"{path}: {added} comentarios nuevos, {changed} ya vistos con votos o polaridad nuevos")
+
+    series = activity_series(state, args.bucket, args.window)
+    series.to_csv(args.out, index_label="bucket")
+    print(series.tail(10))
+    print("\nAutores más activos:")
+    print(author_activity(state).head(10))
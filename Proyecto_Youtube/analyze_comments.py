@@ -0,0 +1,97 @@
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from loader import load_comments, DEFAULT_PATH
+
+# === MODELOS (los mismos del pipeline de teorías en API Wikipedia) ===
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+BATCH_SIZE = 64
+
+
+def load_models():
+    from transformers import pipeline
+    from sentence_transformers import SentenceTransformer
+    sentiment_pipeline = pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+    embedder = SentenceTransformer(EMBEDDING_MODEL)
+    return sentiment_pipeline, embedder
+
+
+# === LOTES POR LONGITUD ===
+# Ordenar los textos únicos por longitud hace que cada lote tenga poco padding.
+def length_buckets(texts, batch_size=BATCH_SIZE):
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    for i in range(0, len(order), batch_size):
+        yield order[i:i + batch_size]
+
+
+def score_texts(texts, sentiment_pipeline, embedder, batch_size=BATCH_SIZE):
+    polarity = np.zeros(len(texts), dtype=np.float32)
+    embeddings = None
+    for idx in length_buckets(texts, batch_size):
+        batch = [texts[i] for i in idx]
+        results = sentiment_pipeline(batch, batch_size=batch_size, truncation=True)
+        polarity[idx] = [r["score"] if r["label"] == "POSITIVE" else -r["score"] for r in results]
+        vectors = embedder.encode(batch, batch_size=batch_size, convert_to_numpy=True)
+        if embeddings is None:
+            embeddings = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[idx] = vectors
+    return polarity, embeddings
+
+
+# === ANÁLISIS DE COMENTARIOS ===
+# Los textos idénticos ("No one", "Anyone 2375?", ...) se infieren una sola vez
+# y el resultado se reparte a todos los cid que lo comparten. Con "groups"
+# (p. ej. los clusters de duplicates.dedup_filter) se infiere solo el primer
+# texto de cada grupo de casi-duplicados.
+def analyze_comments(df, sentiment_pipeline, embedder, batch_size=BATCH_SIZE, groups=None):
+    texts = df["text"].fillna("").astype(str)
+    if groups is None:
+        codes, uniques = pd.factorize(texts)
+    else:
+        codes, _ = pd.factorize(groups)
+        uniques = texts[~pd.Series(codes).duplicated().to_numpy()]
+    polarity, embeddings = score_texts(list(uniques), sentiment_pipeline, embedder, batch_size)
+
+    scores = pd.DataFrame({
+        "cid": df["cid"].to_numpy(),
+        "Polarity": polarity[codes],
+        "Subjectivity": embeddings.std(axis=1)[codes],
+    })
+    return scores, embeddings[codes], len(uniques)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentimiento y embeddings de comentarios de YouTube")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--out", default="comment_scores.csv")
+    parser.add_argument("--embeddings", default=None, help="Archivo .npy opcional con los embeddings por cid")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="Inferir un solo comentario por grupo de casi-duplicados (MinHash/LSH)")
+    args = parser.parse_args()
+
+    df = load_comments(args.path)
+    if df.empty:
+        # Sin comentarios no hay embeddings que escribir ni nada que puntuar
+        sys.exit(f"No hay comentarios en {args.path}")
+    groups = None
+    if args.near_duplicates:
+        from duplicates import dedup_filter
+        groups = dedup_filter(df)["cluster"].to_numpy()
+    sentiment_pipeline, embedder = load_models()
+
+    start = time.perf_counter()
+    scores, embeddings, n_unique = analyze_comments(df, sentiment_pipeline, embedder, args.batch_size, groups)
+    elapsed = time.perf_counter() - start
+
+    scores.to_csv(args.out, index=False, encoding="utf-8")
+    if args.embeddings:
+        np.save(args.embeddings, embeddings)
+
+    print(f"{len(scores)} comentarios ({n_unique} textos únicos) en {elapsed:.1f} s "
+          f"-> {len(scores) / elapsed:.1f} comentarios/s")
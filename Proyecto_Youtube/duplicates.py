@@ -0,0 +1,163 @@
+import argparse
+import re
+import zlib
+import numpy as np
+import pandas as pd
+
+from loader import load_comments, DEFAULT_PATH
+
+# === PARÁMETROS MINHASH / LSH ===
+SHINGLE_SIZE = 4      # Shingles de caracteres (los comentarios son cortos)
+NUM_PERM = 128        # Permutaciones de la firma MinHash
+BANDS = 32            # BANDS * ROWS == NUM_PERM; umbral aprox. (1/BANDS)^(1/ROWS) ~ 0.42
+ROWS = 4
+THRESHOLD = 0.6       # Jaccard estimado mínimo para unir dos comentarios
+PRIME = 4294967311    # Primo > 2^32 para las permutaciones (a*h + b) mod PRIME
+SEED = 42
+
+
+def normalize(text):
+    # Solo se quita la puntuación ASCII: los comentarios de puro emoji ("❤", "😢")
+    # no deben quedar vacíos y caer todos en el mismo grupo
+    text = re.sub(r'[!-/:-@\[-`{-~]', ' ', str(text).lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+# === FIRMAS MINHASH ===
+# Todos los shingles se hashean una vez a uint32 en un solo arreglo plano; la
+# firma de cada comentario es el mínimo por segmento (np.minimum.reduceat), así
+# que el costo es lineal en el número total de shingles.
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=SEED):
+    hashes, offsets = [], []
+    for text in texts:
+        offsets.append(len(hashes))
+        hashes.extend(zlib.crc32(s.encode("utf-8")) for s in shingles(normalize(text)))
+    hashes = np.array(hashes, dtype=np.uint64)
+    offsets = np.array(offsets, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(offsets), num_perm), dtype=np.uint64)
+    for i in range(num_perm):
+        permuted = (a[i] * hashes + b[i]) % PRIME
+        signatures[:, i] = np.minimum.reduceat(permuted, offsets)
+    return signatures
+
+
+# === UNION-FIND ===
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+# === ÍNDICE LSH ===
+# Cada banda de la firma se agrupa con np.unique; solo los comentarios que
+# comparten cubeta se comparan, y solo contra el primero de la cubeta.
+def lsh_clusters(signatures, bands=BANDS, rows=ROWS, threshold=THRESHOLD):
+    n = len(signatures)
+    parent = np.arange(n)
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+        _, bucket = np.unique(keys, return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(bucket[order]) != 0])
+        sizes = np.diff(np.r_[starts, n])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = order[start:start + size]
+            head = members[0]
+            similarity = (signatures[members[1:]] == signatures[head]).mean(axis=1)
+            root = find(parent, head)
+            for other in members[1:][similarity >= threshold]:
+                parent[find(parent, other)] = root
+    return np.array([find(parent, i) for i in range(n)])
+
+
+def near_duplicate_clusters(df, threshold=THRESHOLD):
+    # Los textos que quedan vacíos al normalizar ("+", "???") no tienen shingles
+    # comparables: cada uno queda en su propio grupo en vez de unirse todos
+    texts = df["text"].fillna("").tolist()
+    clusters = np.arange(len(texts))
+    keep = np.flatnonzero([bool(normalize(t)) for t in texts])
+    if len(keep):
+        signatures = minhash_signatures([texts[i] for i in keep])
+        clusters[keep] = keep[lsh_clusters(signatures, threshold=threshold)]
+    return pd.Series(clusters, index=df.index, name="cluster")
+
+
+# === FILTRO DE DUPLICADOS ===
+# Marca un representante por grupo de casi-duplicados. Los análisis de
+# sentimiento pueden inferir solo los representantes y propagar por "cluster".
+def dedup_filter(df, threshold=THRESHOLD):
+    cluster = near_duplicate_clusters(df, threshold)
+    return pd.DataFrame({
+        "cid": df["cid"],
+        "cluster": cluster,
+        "representative": ~cluster.duplicated(),
+    })
+
+
+# === RÁFAGAS DE SPAM POR CANAL ===
+# Por cada (canal, grupo) se busca la ventana deslizante de `window` segundos
+# con más comentarios: con los tiempos ordenados dentro del grupo, el fin de la
+# ventana que empieza en cada comentario sale de un searchsorted.
+def spam_bursts(df, cluster, min_count=3, window=3600.0):
+    data = pd.DataFrame({
+        "channel": df["channel"].astype(str),
+        "author": df["author"].astype(str),
+        "cluster": cluster,
+        "time_parsed": df["time_parsed"],
+        "text": df["text"],
+    }).dropna(subset=["time_parsed"])
+    columns = ["channel", "cluster", "author", "count", "first", "last", "example"]
+    if data.empty:
+        return pd.DataFrame(columns=columns)
+
+    group = data.groupby(["channel", "cluster"], sort=False).ngroup().to_numpy()
+    t = data["time_parsed"].to_numpy()
+    # Clave (grupo, tiempo) en un solo float: los grupos quedan separados por más de una ventana
+    span = t.max() - t.min() + window + 1
+    key = group * span + (t - t.min())
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    end = np.searchsorted(key, key + window, side="right")
+    data = data.iloc[order].reset_index(drop=True)
+    data["group"] = group[order]
+    data["count"] = end - np.arange(len(data))
+    data["last"] = data["time_parsed"].to_numpy()[end - 1]
+
+    best = data.loc[data.groupby("group", sort=False)["count"].idxmax()]
+    bursts = best.rename(columns={"time_parsed": "first", "text": "example"})[columns]
+    bursts = bursts[bursts["count"] >= min_count]
+    return bursts.sort_values("count", ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Casi-duplicados y spam en comentarios (MinHash/LSH)")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--min-count", type=int, default=3)
+    parser.add_argument("--window", type=float, default=3600.0, help="Ventana deslizante de una ráfaga (segundos)")
+    parser.add_argument("--out", default="comment_clusters.csv")
+    args = parser.parse_args()
+
+    df = load_comments(args.path)
+    clusters = dedup_filter(df, args.threshold)
+    clusters.to_csv(args.out, index=False, encoding="utf-8")
+
+    n_clusters = clusters["representative"].sum()
+    print(f"{len(df)} comentarios -> {n_clusters} grupos ({len(df) - n_clusters} casi-duplicados)")
+
+    bursts = spam_bursts(df, clusters["cluster"], args.min_count, args.window)
+    print(f"\nRáfagas de spam por canal ({len(bursts)}):")
+    print(bursts.head(20).to_string(index=False))
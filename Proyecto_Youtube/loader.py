@@ -0,0 +1,79 @@
+import os
+import pandas as pd
+
+# === ESQUEMA DE LOS COMENTARIOS ===
+# Mismas columnas en interestellar_theme_song_youtube_comments.csv,
+# BetterWayToPicturAtoms.csv y youtube-comments.xlsx
+COLUMNS = ["cid", "text", "time", "author", "channel", "votes", "photo", "heart", "reply", "time_parsed"]
+CATEGORICAL = ["author", "channel", "photo"]
+BOOLEAN = ["heart", "reply"]
+
+CACHE_SUFFIX = ".cache.parquet"
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                            "interestellar_theme_song_youtube_comments.csv")
+
+
+def parse_votes(series):
+    # YouTube abrevia los votos: "4.8K", "1.2M"; vacío = 0
+    votes = series.astype("string").str.strip().str.upper().fillna("0")
+    multiplier = votes.str[-1].map({"K": 1_000, "M": 1_000_000}).fillna(1)
+    number = pd.to_numeric(votes.str.rstrip("KM").replace("", "0"), errors="coerce").fillna(0)
+    return (number * multiplier).round().astype("int64")
+
+
+def parse_bool(series):
+    if series.dtype == bool:
+        return series
+    return series.astype("string").str.strip().str.lower().eq("true").fillna(False).astype(bool)
+
+
+def apply_schema(df):
+    df = df[COLUMNS].copy()
+    for col in ["cid", "text", "time"]:
+        df[col] = df[col].astype("string")
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    for col in BOOLEAN:
+        df[col] = parse_bool(df[col])
+    df["votes"] = parse_votes(df["votes"])
+    df["time_parsed"] = pd.to_numeric(df["time_parsed"], errors="coerce").astype("float64")
+    return df
+
+
+def read_raw(path):
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path, dtype=str)
+    return pd.read_csv(path, dtype=str, encoding="utf-8-sig", keep_default_na=False, na_values=[""])
+
+
+def cache_path(path):
+    return path + CACHE_SUFFIX
+
+
+# === CARGA CON CACHÉ COLUMNAR ===
+# La primera lectura convierte el CSV/XLSX y deja un Parquet al lado del archivo.
+# Si el archivo original es más reciente que el Parquet, la caché se regenera.
+def load_comments(path=DEFAULT_PATH, use_cache=True):
+    cached = cache_path(path)
+    if use_cache and os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return pd.read_parquet(cached)
+
+    df = apply_schema(read_raw(path))
+    if use_cache:
+        try:
+            df.to_parquet(cached, index=False)
+        except ImportError as e:
+            print(f"[Sin caché Parquet para {path}] {e}")
+    return df
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    start = time.perf_counter()
+    df = load_comments(path)
+    print(f"{len(df)} comentarios cargados en {time.perf_counter() - start:.3f} s")
+    df.info(memory_usage="deep")
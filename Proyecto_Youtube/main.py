@@ -1,9 +1,9 @@
-import pandas as pd
+from loader import load_comments
 
 
-df = pd.read_csv('BetterWayToPicturAtoms.csv')
+df = load_comments('BetterWayToPicturAtoms.csv')
 
-df.info()
+df.info(memory_usage='deep')
 
 
-print(df.head())
\ No newline at end of file
+print(df.head())